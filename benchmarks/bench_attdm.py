@@ -0,0 +1,123 @@
+"""
+Event-loop stall caused by ATTDM api calls, before and after the async client.
+A stub of the api answers `/players/{campaign_id}/` after `--latency` seconds. `--users` simulated users each
+list their party `--calls` times while a monitor measures how late the event loop wakes up: once with the
+blocking `requests` calls the cog used to make inside its handlers, once with AttdmClient.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_attdm.py --users 5 --calls 10 --latency 0.05
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+
+import requests
+from aiohttp import web
+
+from attdm.client import AttdmClient
+from attdm.stall import LoopStallMonitor
+
+
+class StubAttdmServer:
+    """
+    The ATTDM api's player listing on its own thread and event loop, so a blocked bot loop cannot stall it.
+    """
+    def __init__(self, latency):
+        self.latency = latency
+        self.requests = 0
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.runner = None
+        self.url = None
+
+    async def handle(self, request):
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        campaign_id = request.match_info["campaign_id"]
+        return web.json_response([[f"pc-{campaign_id}-{i}", i, "Fighter 5"] for i in range(4)])
+
+    async def setup(self):
+        app = web.Application()
+        app.router.add_get("/players/{campaign_id}/", self.handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self.runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self.setup(), self.loop).result()
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+async def blocking_user(base_url, campaign_id, calls):
+    for _ in range(calls):
+        response = requests.get(f"{base_url}/players/{campaign_id}/")
+        response.json()
+        await asyncio.sleep(0)
+
+
+async def async_user(client, campaign_id, calls):
+    for _ in range(calls):
+        response = await client.get(f"/players/{campaign_id}/")
+        response.data
+
+
+async def measure(args, base_url, mode):
+    monitor = LoopStallMonitor(interval=0.01, threshold=0.005)
+    monitor.start()
+    await asyncio.sleep(0.05)
+    client = AttdmClient(base_url)
+    started = time.perf_counter()
+    if mode == "requests":
+        await asyncio.gather(*(blocking_user(base_url, user, args.calls) for user in range(args.users)))
+    else:
+        await asyncio.gather(*(async_user(client, user, args.calls) for user in range(args.users)))
+    elapsed = time.perf_counter() - started
+    await client.close()
+    await monitor.stop()
+    return {
+        "mode": mode,
+        "wall_seconds": elapsed,
+        "stalls": monitor.stalls,
+        "stalled_seconds": monitor.stalled_seconds,
+        "max_stall_ms": monitor.max_stall * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=5, help="concurrent simulated users")
+    parser.add_argument("--calls", type=int, default=10, help="api calls per user")
+    parser.add_argument("--latency", type=float, default=0.05, help="stub api seconds per request")
+    parser.add_argument("--json", action="store_true", help="print the reports as JSON")
+    args = parser.parse_args()
+
+    server = StubAttdmServer(args.latency)
+    server.start()
+    try:
+        reports = [asyncio.run(measure(args, server.url, mode)) for mode in ("requests", "aiohttp")]
+    finally:
+        server.stop()
+
+    if args.json:
+        print(json.dumps(reports))
+        return
+    print(f"{args.users} users x {args.calls} calls, {args.latency * 1000:.0f} ms api latency")
+    for report in reports:
+        print(
+            f"  {report['mode']:>8}: {report['wall_seconds']:.2f}s wall, loop stalled {report['stalled_seconds']:.2f}s "
+            f"in {report['stalls']} stalls, longest {report['max_stall_ms']:.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+End-to-end benchmark of the transcription path without a GPU or Discord.
+Synthesizes a recording with lavfi, then runs silence detection, splitting and the upload loop against a local
+stub of the OpenAI-style `/v1/audio/transcriptions` endpoint, reporting wall time per stage, segments/sec,
+bytes uploaded and peak RSS of the bot process and of its ffmpeg children.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_pipeline.py --duration 3600 --gap-every 20 --gap 2 --latency 0.5
+    PYTHONPATH=src python benchmarks/bench_pipeline.py --input /mnt/transcribe/source/session.mkv --concurrency 8
+    PYTHONPATH=src SEGMENT_FORMAT=opus SPLIT_MODE=per_segment python benchmarks/bench_pipeline.py --json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import resource
+import shutil
+import tempfile
+import time
+
+import aiohttp
+import ffmpeg
+from aiohttp import web
+
+from cogs.transcription import TranscribeCog
+from transcribe.upload import SegmentUploader
+
+
+def synthesize(path, duration, gap_every, gap, video):
+    """
+    A tone that drops to silence for `gap` seconds every `gap_every` seconds, optionally with a test picture.
+    """
+    expr = f"0.5*sin(440*2*PI*t)*gte(mod(t,{gap_every}),{gap})"
+    audio = ffmpeg.input(f"aevalsrc='{expr}':s=16000:d={duration}", f='lavfi')
+    if video:
+        picture = ffmpeg.input(f"testsrc=size=640x360:rate=25:duration={duration}", f='lavfi')
+        stream = ffmpeg.output(picture, audio, path, vcodec='libx264', preset='ultrafast', acodec='aac')
+    else:
+        stream = ffmpeg.output(audio, path, acodec='aac')
+    stream.overwrite_output().run(quiet=True)
+
+
+class StubWhisperServer:
+    """
+    Local stand-in for the faster-whisper api: reads the whole upload, waits `latency` seconds
+    (plus up to `jitter` and `per_mb` for every MB received) and answers with a verbose_json body.
+    """
+    def __init__(self, latency=0.2, jitter=0.0, per_mb=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.per_mb = per_mb
+        self.requests = 0
+        self.bytes_received = 0
+        self.runner = None
+        self.url = None
+
+    async def handle(self, request):
+        form = await request.post()
+        upload = form["file"]
+        size = len(upload.file.read())
+        self.requests += 1
+        self.bytes_received += size
+        await asyncio.sleep(self.latency + random.uniform(0, self.jitter) + self.per_mb * size / 1e6)
+        return web.json_response({
+            "text": f"stub transcript of {upload.filename}",
+            "segments": [{"start": 0.0, "end": 1.0, "text": f"stub transcript of {upload.filename}"}],
+        })
+
+    async def start(self):
+        app = web.Application(client_max_size=1024 ** 3)
+        app.router.add_post("/v1/audio/transcriptions", self.handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self.runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}/v1/audio/transcriptions"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size in MB of this process and of the largest child (ffmpeg) so far.
+    """
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return own, children
+
+
+async def upload(cog, server, segment_files, file, concurrency):
+    async with aiohttp.ClientSession() as session:
+        uploader = SegmentUploader(
+            session, server.url, concurrency=concurrency, model=cog.model,
+            suffix=f".{cog.profile.ext}" if cog.profile.ext else "", retry_policy=cog.retry_policy
+        )
+        results = await uploader.upload_all(segment_files, file)
+    return uploader, sum(result is None for result in results)
+
+
+async def run(args, workdir, input_file):
+    os.environ["TMP_DIR"] = workdir
+    os.environ.setdefault("TRANSCRIPTION_CACHE_PATH", "")
+    cog = TranscribeCog(None)
+    server = StubWhisperServer(args.latency, args.jitter, args.per_mb)
+    await server.start()
+    report = {"input": input_file, "split_mode": cog.split_mode, "detector": cog.silence_detector, "segment_format": cog.profile.name}
+    try:
+        report["duration"] = cog.probe_duration(input_file)
+
+        started = time.perf_counter()
+        silence_ends = await cog.media.run(
+            cog.plan_segments, input_file, args.silence_threshold, args.silence_duration
+        )
+        report["detect_seconds"] = time.perf_counter() - started
+
+        ext = cog.profile.extension(os.path.splitext(input_file)[1][1:])
+        started = time.perf_counter()
+        segment_files = await cog.split_audio(input_file, silence_ends, ext)
+        report["split_seconds"] = time.perf_counter() - started
+        report["segments"] = len(segment_files)
+        report["segment_bytes"] = sum(os.path.getsize(path) for path in segment_files)
+
+        started = time.perf_counter()
+        uploader, failed = await upload(cog, server, segment_files, os.path.basename(input_file), args.concurrency)
+        report["upload_seconds"] = time.perf_counter() - started
+        report["bytes_uploaded"] = uploader.bytes_uploaded
+        report["failed_segments"] = failed
+        for segment_path in segment_files:
+            cog.remove_segment(segment_path)
+    finally:
+        await server.stop()
+        cog.media.shutdown()
+    report["media"] = cog.media.describe()
+    total = report["detect_seconds"] + report["split_seconds"] + report["upload_seconds"]
+    report["total_seconds"] = total
+    report["segments_per_second"] = report["segments"] / total if total else 0.0
+    report["peak_rss_mb"], report["peak_child_rss_mb"] = peak_rss_mb()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", help="existing media file, synthesized when omitted")
+    parser.add_argument("--duration", type=int, default=1800, help="synthesized length in seconds")
+    parser.add_argument("--gap-every", type=float, default=20, help="seconds between synthesized silences")
+    parser.add_argument("--gap", type=float, default=2, help="length of each synthesized silence")
+    parser.add_argument("--video", action="store_true", help="synthesize a video track as well")
+    parser.add_argument("--silence-threshold", default="-30dB")
+    parser.add_argument("--silence-duration", type=float, default=1)
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("UPLOAD_CONCURRENCY", "4")))
+    parser.add_argument("--latency", type=float, default=0.2, help="stub api seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random stub latency, up to this many seconds")
+    parser.add_argument("--per-mb", type=float, default=0.0, help="extra stub latency per MB uploaded")
+    parser.add_argument("--json", action="store_true", help="print the report as one JSON object")
+    args = parser.parse_args()
+
+    if not shutil.which("ffmpeg"):
+        raise SystemExit("ffmpeg is required to run this benchmark")
+    logging.basicConfig(level=logging.WARNING, force=True)
+
+    workdir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    try:
+        input_file = args.input
+        if not input_file:
+            input_file = os.path.join(workdir, "input.mp4" if args.video else "input.m4a")
+            synthesize(input_file, args.duration, args.gap_every, args.gap, args.video)
+        report = asyncio.run(run(args, workdir, input_file))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(report))
+        return
+    print(
+        f"input={report['input']} duration={report['duration'] or 0:.0f}s split_mode={report['split_mode']} "
+        f"detector={report['detector']} segment_format={report['segment_format']}"
+    )
+    print(f"  detect: {report['detect_seconds']:.2f}s")
+    print(f"   split: {report['split_seconds']:.2f}s ({report['segments']} segments, {report['segment_bytes'] / 1e6:.1f} MB)")
+    print(
+        f"  upload: {report['upload_seconds']:.2f}s ({report['bytes_uploaded'] / 1e6:.1f} MB uploaded, "
+        f"{report['failed_segments']} failed, concurrency {args.concurrency})"
+    )
+    print(
+        f"   total: {report['total_seconds']:.2f}s, {report['segments_per_second']:.2f} segments/s, "
+        f"peak RSS {report['peak_rss_mb']:.0f} MB (ffmpeg {report['peak_child_rss_mb']:.0f} MB)"
+    )
+    print(f"   media: {report['media']}")
+
+
+if __name__ == "__main__":
+    main()
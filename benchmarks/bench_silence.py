@@ -0,0 +1,90 @@
+"""
+Compare ffmpeg's silencedetect filter against the numpy PCM silence detector.
+Reports throughput in audio-seconds per CPU-second (ffmpeg child CPU included) and whether the cut points agree.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_silence.py --duration 3600 --gap-every 15 --gap 2
+    PYTHONPATH=src python benchmarks/bench_silence.py --input /mnt/transcribe/source/session.mkv
+"""
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+import ffmpeg
+
+from cogs.transcription import TranscribeCog
+
+
+def synthesize(path, duration, gap_every, gap):
+    """
+    A tone that drops to silence for `gap` seconds every `gap_every` seconds.
+    """
+    expr = f"0.5*sin(440*2*PI*t)*gte(mod(t,{gap_every}),{gap})"
+    (
+        ffmpeg
+        .input(f"aevalsrc='{expr}':s=16000:d={duration}", f='lavfi')
+        .output(path, acodec='aac')
+        .overwrite_output()
+        .run(quiet=True)
+    )
+
+
+def cpu_seconds():
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def run(cog, input_file, silence_threshold, silence_duration):
+    started = time.perf_counter()
+    cpu_started = cpu_seconds()
+    silences = list(cog.iter_silences(input_file, silence_threshold, silence_duration))
+    return time.perf_counter() - started, cpu_seconds() - cpu_started, silences
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", help="existing media file, synthesized when omitted")
+    parser.add_argument("--duration", type=int, default=1800, help="synthesized length in seconds")
+    parser.add_argument("--gap-every", type=float, default=15)
+    parser.add_argument("--gap", type=float, default=2)
+    parser.add_argument("--threshold", default="-30dB")
+    parser.add_argument("--silence-duration", type=float, default=1)
+    args = parser.parse_args()
+
+    if not shutil.which("ffmpeg"):
+        raise SystemExit("ffmpeg is required to run this benchmark")
+    logging.basicConfig(level=logging.WARNING, force=True)
+
+    workdir = tempfile.mkdtemp(prefix="bench_silence_")
+    try:
+        input_file = args.input
+        if not input_file:
+            input_file = os.path.join(workdir, "input.m4a")
+            synthesize(input_file, args.duration, args.gap_every, args.gap)
+        duration = float(ffmpeg.probe(input_file)["format"]["duration"])
+        print(f"input={input_file} duration={duration:.0f}s")
+
+        cog = TranscribeCog(None)
+        found = {}
+        for detector in ("ffmpeg", "numpy"):
+            cog.silence_detector = detector
+            wall, cpu, silences = run(cog, input_file, args.threshold, args.silence_duration)
+            found[detector] = silences
+            print(
+                f"{detector:>7}: wall={wall:.2f}s cpu={cpu:.2f}s silences={len(silences)} "
+                f"throughput={duration / max(cpu, 1e-9):.0f} audio-s/cpu-s"
+            )
+
+        pairs = list(zip(found["ffmpeg"], found["numpy"]))
+        if pairs:
+            drift = max(abs(a[1] - b[1]) for a, b in pairs)
+            print(f"max silence_end difference over {len(pairs)} matched silences: {drift:.3f}s")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Compare the per-segment ffmpeg loop against the single-pass segment muxer.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_split.py --duration 3600 --interval 20
+    PYTHONPATH=src python benchmarks/bench_split.py --input /mnt/transcribe/source/session.mkv --interval 20
+"""
+import argparse
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+import ffmpeg
+
+from cogs.transcription import TranscribeCog
+
+
+def synthesize(path, duration, video):
+    """
+    Generate a test file of `duration` seconds with lavfi sources.
+    """
+    audio = ffmpeg.input(f"sine=frequency=440:duration={duration}", f='lavfi')
+    if video:
+        picture = ffmpeg.input(f"testsrc=size=640x360:rate=25:duration={duration}", f='lavfi')
+        stream = ffmpeg.output(picture, audio, path, vcodec='libx264', preset='ultrafast', acodec='aac')
+    else:
+        stream = ffmpeg.output(audio, path, acodec='aac')
+    stream.overwrite_output().run(quiet=True)
+
+
+def probe_duration(path):
+    return float(ffmpeg.probe(path)["format"]["duration"])
+
+
+async def run(engine, input_file, silence_ends, ext):
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    children_started = os.times().children_user + os.times().children_system
+    segment_files = await engine(input_file, silence_ends, ext)
+    wall = time.perf_counter() - started
+    children = os.times().children_user + os.times().children_system - children_started
+    cpu = time.process_time() - cpu_started + children
+    for segment_path in segment_files:
+        os.unlink(segment_path)
+    return wall, cpu, len(segment_files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", help="existing media file, synthesized when omitted")
+    parser.add_argument("--duration", type=int, default=1800, help="synthesized length in seconds")
+    parser.add_argument("--video", action="store_true", help="synthesize a video track as well")
+    parser.add_argument("--interval", type=float, default=20, help="seconds between cut points")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if not shutil.which("ffmpeg"):
+        raise SystemExit("ffmpeg is required to run this benchmark")
+    logging.basicConfig(level=logging.WARNING, force=True)
+
+    workdir = tempfile.mkdtemp(prefix="bench_split_")
+    try:
+        input_file = args.input
+        if not input_file:
+            input_file = os.path.join(workdir, "input.mp4" if args.video else "input.m4a")
+            synthesize(input_file, args.duration, args.video)
+        ext = os.path.splitext(input_file)[1][1:]
+        duration = probe_duration(input_file)
+        silence_ends = []
+        point = args.interval
+        while point < duration:
+            silence_ends.append(point)
+            point += args.interval
+
+        os.environ["TMP_DIR"] = workdir
+        cog = TranscribeCog(None)
+        engines = {
+            "per_segment": cog.split_audio_silence,
+            "single_pass": cog.split_audio_single_pass,
+        }
+        print(f"input={input_file} duration={duration:.0f}s cuts={len(silence_ends)}")
+        for name, engine in engines.items():
+            timings = [asyncio.run(run(engine, input_file, silence_ends, ext)) for _ in range(args.repeat)]
+            wall = min(t[0] for t in timings)
+            cpu = min(t[1] for t in timings)
+            print(f"{name:>12}: wall={wall:.2f}s cpu={cpu:.2f}s segments={timings[0][2]}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+Helpers for the ATTDM cog: the async client for the Assistant to the Dungeon Manager api.
+"""
@@ -0,0 +1,98 @@
+import time
+from collections import OrderedDict
+
+
+def cache_scope(path, payload=None):
+    """
+    The (resource, campaign id) a path belongs to: `/players/7/passive-stats/` is ("players", "7"),
+    `/campaigns/` is ("campaigns", None). Writes that name the campaign in their JSON body instead of the
+    path (`POST /players/`, `POST /npcs/`) take it from there.
+    """
+    parts = [part for part in path.split("/") if part]
+    resource = parts[0] if parts else ""
+    campaign = parts[1] if len(parts) > 1 else None
+    if campaign is None and isinstance(payload, dict) and payload.get("campaign_id") is not None:
+        campaign = payload["campaign_id"]
+    return resource, None if campaign is None else str(campaign)
+
+
+class ResponseCache:
+    """
+    Read-through cache of successful ATTDM GET responses, keyed by path and query parameters.
+    Entries expire after the TTL of their resource (`ttls`, else `default_ttl` seconds) and the least
+    recently used are evicted beyond `max_entries`. The data rarely changes except through this bot, so
+    a write invalidates every cached read of the same resource and campaign as soon as it is sent.
+    """
+    def __init__(self, default_ttl=60.0, ttls=None, max_entries=512):
+        self.default_ttl = default_ttl
+        self.ttls = ttls or {}
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # Bumped by every invalidation, so a read that started before a write can tell not to cache its result.
+        self.generation = 0
+
+    @classmethod
+    def from_config(cls, default_ttl, ttls, max_entries):
+        """
+        `ttls` is `resource=seconds,...`, e.g. `campaigns=300,players=30`.
+        """
+        parsed = {}
+        for item in filter(None, (part.strip() for part in (ttls or "").split(","))):
+            resource, _, seconds = item.partition("=")
+            parsed[resource.strip().strip("/")] = float(seconds)
+        return cls(float(default_ttl), parsed, int(max_entries))
+
+    @staticmethod
+    def key(path, params):
+        return path, tuple(sorted((params or {}).items()))
+
+    def ttl(self, path):
+        return self.ttls.get(cache_scope(path)[0], self.default_ttl)
+
+    def get(self, path, params=None):
+        key = self.key(path, params)
+        entry = self.entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    def put(self, path, params, response):
+        ttl = self.ttl(path)
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        key = self.key(path, params)
+        self.entries[key] = (time.monotonic() + ttl, cache_scope(path), response)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, path, payload=None):
+        """
+        Drop cached reads made stale by a write to `path`. A write that names no campaign drops the
+        whole resource.
+        """
+        self.generation += 1
+        resource, campaign = cache_scope(path, payload)
+        stale = [
+            key for key, (_, scope, _) in self.entries.items()
+            if scope[0] == resource and (campaign is None or scope[1] == campaign)
+        ]
+        for key in stale:
+            del self.entries[key]
+        self.invalidations += len(stale)
+
+    def describe(self):
+        lookups = self.hits + self.misses
+        hit_rate = self.hits / lookups if lookups else 0.0
+        return (
+            f"{len(self.entries)}/{self.max_entries} entries, {self.hits} hits, {self.misses} misses "
+            f"({hit_rate:.0%} hit rate), {self.invalidations} invalidated"
+        )
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import time
+
+import aiohttp
+
+from attdm.cache import ResponseCache, cache_scope
+
+
+class AttdmError(RuntimeError):
+    """
+    The ATTDM api could not be reached or did not answer in time.
+    """
+
+
+class ApiResponse:
+    """
+    A finished api call: HTTP status and the decoded JSON body (the raw text if it was not JSON).
+    """
+    __slots__ = ("status", "data")
+
+    def __init__(self, status, data):
+        self.status = status
+        self.data = data
+
+    @property
+    def ok(self):
+        return self.status == 200
+
+    @property
+    def detail(self):
+        if isinstance(self.data, dict):
+            return self.data.get("detail", "Unknown error")
+        return self.data or "Unknown error"
+
+
+class AttdmClient:
+    """
+    Async client for the ATTDM api on one long-lived aiohttp session, so commands never block the event loop
+    and consecutive calls reuse pooled keep-alive connections. Every call has a timeout (`timeout` seconds
+    overall by default, `connect_timeout` to open a connection) and returns an ApiResponse with the body decoded.
+    Network errors and timeouts are raised as AttdmError.
+    With a ResponseCache, successful GETs are answered from it while fresh and every write invalidates
+    the reads it affects. Identical GETs issued while one is already in flight share its response
+    instead of sending their own request.
+    """
+    def __init__(self, base_url, timeout=10.0, connect_timeout=5.0, max_connections=20, cache=None):
+        self.base_url = (base_url or "").rstrip("/")
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_connections = max_connections
+        self.cache = cache
+        self.session = None
+        self.inflight = {}
+        self.requests = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+
+    def get_session(self):
+        """
+        The session shared by every call, created on first use.
+        """
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=self.timeout, sock_connect=self.connect_timeout),
+            )
+        return self.session
+
+    async def request(self, method, path, params=None, json=None, timeout=None):
+        """
+        Call `path` (relative to the api base url) and return its ApiResponse, whatever the status.
+        `timeout` overrides the client's overall timeout for this call.
+        """
+        if not self.base_url:
+            raise AttdmError("API_URL is not set")
+        url = f"{self.base_url}{path}"
+        kwargs = {"params": params, "json": json}
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout, sock_connect=self.connect_timeout)
+        self.requests += 1
+        started = time.monotonic()
+        try:
+            async with self.get_session().request(method, url, **kwargs) as response:
+                text = await response.text()
+                try:
+                    data = await response.json(content_type=None) if text else None
+                except ValueError:
+                    data = text
+                return ApiResponse(response.status, data)
+        except asyncio.TimeoutError:
+            self.errors += 1
+            raise AttdmError(f"{method} {path} timed out after {timeout or self.timeout:g}s") from None
+        except aiohttp.ClientError as e:
+            self.errors += 1
+            raise AttdmError(f"{method} {path} failed: {e}") from e
+        finally:
+            elapsed = time.monotonic() - started
+            self.busy_seconds += elapsed
+            logging.debug(f"ATTDM {method} {path} took {elapsed:.3f}s")
+            # Invalidate even when the write failed, it may still have been applied.
+            if method != "GET":
+                self.forget_inflight(path, json)
+                if self.cache is not None:
+                    self.cache.invalidate(path, json)
+
+    async def get(self, path, params=None, cached=True, **kwargs):
+        """
+        GET `path`, from the cache when it holds a fresh copy unless `cached` is False, else joining an
+        identical GET already in flight. Responses are shared between callers and must not be modified.
+        """
+        if self.cache is not None and cached:
+            response = self.cache.get(path, params)
+            if response is not None:
+                return response
+        key = ResponseCache.key(path, params)
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.fetch(path, params, **kwargs))
+            self.inflight[key] = task
+            task.add_done_callback(lambda done: self.fetch_done(key, done))
+        else:
+            self.coalesced += 1
+        # One caller giving up must not cancel the request for the others.
+        return await asyncio.shield(task)
+
+    async def fetch(self, path, params, **kwargs):
+        generation = self.cache.generation if self.cache is not None else None
+        response = await self.request("GET", path, params=params, **kwargs)
+        # A write sent meanwhile may have made this response stale, hand it out but don't cache it.
+        if response.ok and self.cache is not None and self.cache.generation == generation:
+            self.cache.put(path, params, response)
+        return response
+
+    def fetch_done(self, key, task):
+        if self.inflight.get(key) is task:
+            del self.inflight[key]
+        if not task.cancelled():
+            # Retrieved here too, in case every caller was cancelled before it finished.
+            task.exception()
+
+    def forget_inflight(self, path, payload=None):
+        """
+        Stop handing GETs in flight for the resource and campaign of a write to new callers, they may
+        return data from before the write.
+        """
+        resource, campaign = cache_scope(path, payload)
+        for key in list(self.inflight):
+            scope = cache_scope(key[0])
+            if scope[0] == resource and (campaign is None or scope[1] == campaign):
+                del self.inflight[key]
+
+    async def post(self, path, params=None, json=None, **kwargs):
+        return await self.request("POST", path, params=params, json=json, **kwargs)
+
+    async def put(self, path, params=None, json=None, **kwargs):
+        return await self.request("PUT", path, params=params, json=json, **kwargs)
+
+    async def delete(self, path, params=None, **kwargs):
+        return await self.request("DELETE", path, params=params, **kwargs)
+
+    async def close(self):
+        for task in self.inflight.values():
+            task.cancel()
+        if self.session is not None:
+            await self.session.close()
+
+    def describe(self):
+        average = self.busy_seconds / self.requests if self.requests else 0.0
+        return (
+            f"{self.requests} requests, {self.errors} errors, {average * 1000:.0f} ms average, "
+            f"{self.coalesced} saved by coalescing ({len(self.inflight)} in flight)"
+        )
@@ -0,0 +1,139 @@
+import logging
+import sqlite3
+import threading
+import time
+
+
+class UserSession:
+    """
+    One Discord user's selections: the campaign they work in, the character they picked and the loot
+    item pending for that character.
+    """
+    __slots__ = ("user_id", "campaign_id", "character_name", "character_id", "selected_loot", "last_used")
+    FIELDS = ("campaign_id", "character_name", "character_id", "selected_loot")
+
+    def __init__(self, user_id, campaign_id=None, character_name=None, character_id=None, selected_loot=None, last_used=None):
+        self.user_id = user_id
+        self.campaign_id = campaign_id
+        self.character_name = character_name
+        self.character_id = character_id
+        self.selected_loot = selected_loot
+        self.last_used = time.time() if last_used is None else last_used
+
+
+class SessionStore:
+    """
+    Per-user sessions for the ATTDM cog. Sessions idle for longer than `idle_ttl` seconds are dropped.
+    With a `path`, sessions are also kept in SQLite and loaded again on startup, so selections survive a
+    restart; every change is written through and unexpired rows are read once when the store is created.
+    """
+    def __init__(self, idle_ttl=43200.0, path=None, sweep_interval=60.0):
+        self.idle_ttl = idle_ttl
+        self.path = path
+        self.sweep_interval = sweep_interval
+        self.sessions = {}
+        self.evicted = 0
+        self.last_sweep = time.monotonic()
+        self.lock = threading.Lock()
+        self.db = None
+        if path:
+            self.db = sqlite3.connect(path, check_same_thread=False)
+            with self.db:
+                self.db.execute(
+                    "CREATE TABLE IF NOT EXISTS sessions ("
+                    "user_id INTEGER PRIMARY KEY, campaign_id INTEGER, character_name TEXT, character_id, "
+                    "selected_loot TEXT, last_used REAL NOT NULL)"
+                )
+            self.load()
+
+    def load(self):
+        cutoff = time.time() - self.idle_ttl
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM sessions WHERE last_used < ?", (cutoff,))
+            rows = self.db.execute(
+                "SELECT user_id, campaign_id, character_name, character_id, selected_loot, last_used FROM sessions"
+            ).fetchall()
+        for row in rows:
+            self.sessions[row[0]] = UserSession(*row)
+        logging.info(f"Loaded {len(rows)} ATTDM sessions from {self.path}")
+
+    def expired(self, session, now=None):
+        return (now or time.time()) - session.last_used > self.idle_ttl
+
+    def get(self, user_id):
+        """
+        The user's session, or None if they have none or it went idle.
+        """
+        self.evict_idle()
+        session = self.sessions.get(user_id)
+        if session is None:
+            return None
+        now = time.time()
+        if self.expired(session, now):
+            self.remove(user_id)
+            return None
+        # Reads keep a session alive too, written through at most once per sweep interval.
+        if now - session.last_used > self.sweep_interval:
+            session.last_used = now
+            self.save(session)
+        return session
+
+    def campaign(self, user_id):
+        session = self.get(user_id)
+        return session.campaign_id if session is not None else None
+
+    def update(self, user_id, **fields):
+        """
+        Set fields of the user's session, creating it if needed, and return it.
+        """
+        unknown = set(fields) - set(UserSession.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown session field(s) {', '.join(sorted(unknown))}")
+        session = self.get(user_id) or UserSession(user_id)
+        for name, value in fields.items():
+            setattr(session, name, value)
+        session.last_used = time.time()
+        self.sessions[user_id] = session
+        self.save(session)
+        return session
+
+    def save(self, session):
+        if self.db is None:
+            return
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO sessions "
+                "(user_id, campaign_id, character_name, character_id, selected_loot, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                (session.user_id, *(getattr(session, name) for name in UserSession.FIELDS), session.last_used),
+            )
+
+    def remove(self, user_id):
+        self.sessions.pop(user_id, None)
+        if self.db is not None:
+            with self.lock, self.db:
+                self.db.execute("DELETE FROM sessions WHERE user_id = ?", (user_id,))
+
+    def evict_idle(self):
+        """
+        Drop every idle session, at most once per `sweep_interval` seconds.
+        """
+        if time.monotonic() - self.last_sweep < self.sweep_interval:
+            return
+        self.last_sweep = time.monotonic()
+        now = time.time()
+        idle = [user_id for user_id, session in self.sessions.items() if self.expired(session, now)]
+        for user_id in idle:
+            self.sessions.pop(user_id)
+        if idle and self.db is not None:
+            with self.lock, self.db:
+                self.db.execute("DELETE FROM sessions WHERE last_used < ?", (now - self.idle_ttl,))
+        self.evicted += len(idle)
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def describe(self):
+        storage = f"persisted to {self.path}" if self.path else "in memory"
+        return f"{len(self.sessions)} active, {self.evicted} evicted after {self.idle_ttl / 3600:g}h idle, {storage}"
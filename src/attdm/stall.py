@@ -0,0 +1,40 @@
+import asyncio
+import time
+
+
+class LoopStallMonitor:
+    """
+    Measures how long the event loop is blocked: a task asks to wake every `interval` seconds and counts
+    any lateness beyond `threshold` as a stall. Blocking calls in a coroutine (sync HTTP, file IO) show up
+    here as stalls, since heartbeats, button clicks and every other task wait for them too.
+    """
+    def __init__(self, interval=0.05, threshold=0.02):
+        self.interval = interval
+        self.threshold = threshold
+        self.task = None
+        self.stalls = 0
+        self.stalled_seconds = 0.0
+        self.max_stall = 0.0
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    async def run(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = time.monotonic() - expected
+            if lag > self.threshold:
+                self.stalls += 1
+                self.stalled_seconds += lag
+                self.max_stall = max(self.max_stall, lag)
+
+    def describe(self):
+        return f"{self.stalls} stalls over {self.threshold * 1000:.0f} ms, {self.stalled_seconds:.2f}s total, longest {self.max_stall * 1000:.0f} ms"
@@ -3,10 +3,14 @@ import discord
 import json
 import logging
 import os
-import requests
 from discord.ext import commands
 from discord.ui import Button, View
 
+from attdm.cache import ResponseCache
+from attdm.client import AttdmClient
+from attdm.sessions import SessionStore
+from attdm.stall import LoopStallMonitor
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -20,8 +24,56 @@ class AttdmCog(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
-        self.api_base_url = os.getenv("API_URL")
-        self.user_sessions = {}
+        self.api = AttdmClient(
+            os.getenv("API_URL"),
+            timeout=float(os.getenv("API_TIMEOUT", "10")),
+            connect_timeout=float(os.getenv("API_CONNECT_TIMEOUT", "5")),
+            max_connections=int(os.getenv("API_MAX_CONNECTIONS", "20")),
+            cache=ResponseCache.from_config(
+                os.getenv("API_CACHE_TTL", "60"),
+                os.getenv("API_CACHE_TTLS", ""),
+                os.getenv("API_CACHE_MAX_ENTRIES", "512"),
+            ),
+        )
+        # Off by default: the monitor wakes every interval for as long as it runs.
+        monitor_interval = float(os.getenv("LOOP_MONITOR_INTERVAL", "0"))
+        self.loop_monitor = None
+        if monitor_interval > 0:
+            self.loop_monitor = LoopStallMonitor(interval=monitor_interval, threshold=max(0.02, monitor_interval / 10))
+        self.sessions = SessionStore(
+            idle_ttl=float(os.getenv("SESSION_IDLE_TTL", "43200")),
+            path=os.getenv("SESSION_STORE_PATH") or None,
+        )
+
+    async def cog_load(self):
+        if self.loop_monitor is not None:
+            self.loop_monitor.start()
+
+    async def cog_unload(self):
+        if self.loop_monitor is not None:
+            await self.loop_monitor.stop()
+        await self.api.close()
+        self.sessions.close()
+
+    def select_campaign_for(self, user_id, campaign_id):
+        """
+        Switch the user to a campaign, dropping the character and loot they picked in the previous one.
+        """
+        self.sessions.update(
+            user_id, campaign_id=int(campaign_id), character_name=None, character_id=None, selected_loot=None
+        )
+
+    @commands.command(name="attdm_status")
+    async def attdm_status(self, ctx):
+        """
+        Show ATTDM api call statistics, the response cache, user sessions and how long the event loop has been blocked.
+        Usage: !attdm_status
+        """
+        await ctx.send(
+            f"ATTDM api: {self.api.describe()}\nCache: {self.api.cache.describe()}\n"
+            f"Sessions: {self.sessions.describe()}\n"
+            f"Event loop: {self.loop_monitor.describe() if self.loop_monitor is not None else 'not measured, set LOOP_MONITOR_INTERVAL'}"
+        )
 
     # Menus
     @commands.command(name="dnd")
@@ -314,8 +366,8 @@ class AttdmCog(commands.Cog):
             logging.warning("DM name input timed out.")
             return
 
-        # Prepare the API URL and payload
-        url = f"{self.api_base_url}/campaigns/"
+        # Prepare the API path and payload
+        path = "/campaigns/"
         payload = {
             "name": campaign_name,
             "dm": dm_name,
@@ -323,16 +375,16 @@ class AttdmCog(commands.Cog):
         }
 
         try:
-            logging.info(f"Sending POST request to {url} with payload: {payload}")
-            response = requests.post(url, json=payload)
-            if response.status_code == 200:
-                data = response.json()
+            logging.info(f"Sending POST request to {path} with payload: {payload}")
+            response = await self.api.post(path, json=payload)
+            if response.ok:
+                data = response.data
                 campaign_id = data.get("campaign_id")
-                self.user_sessions[ctx.author.id] = int(campaign_id)
+                self.select_campaign_for(ctx.author.id, campaign_id)
                 await ctx.send(f"Campaign '{campaign_name}' created successfully! (ID: {campaign_id})")
                 logging.info(f"Campaign '{campaign_name}' created successfully with ID: {campaign_id}")
             else:
-                error_detail = response.json().get("detail", "Unknown error")
+                error_detail = response.detail
                 await ctx.send(f"Failed to create campaign: {error_detail}")
                 logging.error(f"Failed to create campaign: {error_detail}")
         except Exception as e:
@@ -345,12 +397,12 @@ class AttdmCog(commands.Cog):
         List all campaigns.
         Usage: !select_campaign
         """
-        url = f"{self.api_base_url}/campaigns/"
+        path = "/campaigns/"
         try:
-            logging.info(f"Fetching campaigns from {url}")
-            response = requests.get(url)
-            if response.status_code == 200:
-                campaigns = response.json()
+            logging.info(f"Fetching campaigns from {path}")
+            response = await self.api.get(path)
+            if response.ok:
+                campaigns = response.data
                 if campaigns:
                     class SelectCampaignView(View):
                         def __init__(self, cog):
@@ -363,7 +415,7 @@ class AttdmCog(commands.Cog):
                                 button = Button(label=f"{campaign_name} (DM: {dm_name})", style=discord.ButtonStyle.primary)
 
                                 async def button_callback(interaction: discord.Interaction, campaign_id=campaign_id, campaign_name=campaign_name):
-                                    self.cog.user_sessions[ctx.author.id] = int(campaign_id)
+                                    self.cog.select_campaign_for(ctx.author.id, campaign_id)
                                     self.selected_campaign = campaign_id
                                     await interaction.response.send_message(
                                         f"Campaign '{campaign_name}' selected! (ID: {campaign_id})", ephemeral=True
@@ -390,7 +442,7 @@ class AttdmCog(commands.Cog):
                     await ctx.send("No campaigns found.")
                     logging.warning("No campaigns found.")
             else:
-                error_detail = response.json().get("detail", "Unknown error")
+                error_detail = response.detail
                 await ctx.send(f"Failed to list campaigns: {error_detail}")
                 logging.error(f"Failed to list campaigns: {error_detail}")
         except Exception as e:
@@ -403,7 +455,7 @@ class AttdmCog(commands.Cog):
         Display the currently selected campaign for the user.
         Usage: !current_campaign
         """
-        campaign_id = self.user_sessions.get(ctx.author.id)
+        campaign_id = self.sessions.campaign(ctx.author.id)
         if campaign_id:
             logging.info(f"User {ctx.author.id} is currently in campaign {campaign_id}.")
             await ctx.send(f"Your current campaign ID is: {campaign_id}")
@@ -421,7 +473,7 @@ class AttdmCog(commands.Cog):
         Usage: !add_character
         """
         # Check if the user has already selected a campaign
-        campaign_id = self.user_sessions.get(ctx.author.id)
+        campaign_id = self.sessions.campaign(ctx.author.id)
         if not campaign_id:
             logging.warning(f"User {ctx.author.id} attempted to add a character without selecting a campaign.")
             await ctx.send("You have not selected a campaign yet. Use !select_campaign to select one.")
@@ -442,21 +494,21 @@ class AttdmCog(commands.Cog):
             await ctx.send("You took too long to respond. Adding character to campaign canceled.")
             return
 
-        # Prepare the API URL and payload
-        url = f"{self.api_base_url}/players/"
+        # Prepare the API path and payload
+        path = "/players/"
         payload = {
             "character_id": character_id,
             "campaign_id": campaign_id
         }
 
         try:
-            logging.info(f"Sending POST request to {url} with payload: {payload}")
-            response = requests.post(url, json=payload)
-            if response.status_code == 200:
+            logging.info(f"Sending POST request to {path} with payload: {payload}")
+            response = await self.api.post(path, json=payload)
+            if response.ok:
                 logging.info(f"Character '{character_id}' added to campaign '{campaign_id}' successfully.")
                 await ctx.send(f"Character '{character_id}' added to campaign '{campaign_id}' successfully!")
             else:
-                error_detail = response.json().get("detail", "Unknown error")
+                error_detail = response.detail
                 logging.error(f"Failed to add character to campaign: {error_detail}")
                 await ctx.send(f"Failed to add character to campaign: {error_detail}")
         except Exception as e:
@@ -470,18 +522,20 @@ class AttdmCog(commands.Cog):
         Usage: !select_player
         """
         # Get the currently selected campaign ID for the user
-        campaign_id = self.user_sessions.get(ctx.author.id)
+        campaign_id = self.sessions.campaign(ctx.author.id)
         if not campaign_id:
             logging.warning(f"User {ctx.author.id} attempted to select a player without selecting a campaign.")
             await ctx.send("You have not selected a campaign yet. Use !select_campaign to select one.")
             return
+        # Forget the previous pick so callers only see a character chosen this time.
+        self.sessions.update(ctx.author.id, character_name=None, character_id=None)
 
-        url = f"{self.api_base_url}/players/{campaign_id}/"
+        path = f"/players/{campaign_id}/"
         try:
-            logging.info(f"Fetching players for campaign {campaign_id} from {url}.")
-            response = requests.get(url)
-            if response.status_code == 200:
-                pcs = response.json()
+            logging.info(f"Fetching players for campaign {campaign_id} from {path}.")
+            response = await self.api.get(path)
+            if response.ok:
+                pcs = response.data
                 if pcs:
                     logging.info(f"Players found for campaign {campaign_id}: {pcs}.")
                     view = View(timeout=60)
@@ -491,8 +545,7 @@ class AttdmCog(commands.Cog):
                         button = Button(label=f"{pc_name} ({class_level})", style=discord.ButtonStyle.primary)
 
                         async def button_callback(interaction: discord.Interaction, pc_name=pc_name, character_id=character_id):
-                            self.user_sessions["character_name"] = pc_name
-                            self.user_sessions["character_id"] = character_id
+                            self.sessions.update(ctx.author.id, character_name=pc_name, character_id=character_id)
                             logging.info(f"User {ctx.author.id} selected player '{pc_name}'.")
                             await interaction.response.send_message(f"Player '{pc_name}' selected!", ephemeral=True)
                             nonlocal player_selected
@@ -505,7 +558,6 @@ class AttdmCog(commands.Cog):
                     await view.wait()
 
                     # Check if a player was selected
-                    selected_pc = self.user_sessions.get("character_name")
                     if not player_selected:
                         logging.warning(f"User {ctx.author.id} did not select a player.")
                         await ctx.send("No player character selected.")
@@ -515,7 +567,7 @@ class AttdmCog(commands.Cog):
                     await ctx.send("No players found in the selected campaign.")
                     return
             else:
-                error_detail = response.json().get("detail", "Unknown error")
+                error_detail = response.detail
                 logging.error(f"Failed to list players for campaign {campaign_id}: {error_detail}")
                 await ctx.send(f"Failed to list players: {error_detail}")
                 return
@@ -529,18 +581,21 @@ class AttdmCog(commands.Cog):
         """
         Delete a player character. Requires the same character id used to import a character
         """
-        campaign_id = self.user_sessions.get(ctx.author.id)
+        campaign_id = self.sessions.campaign(ctx.author.id)
         if not campaign_id:
             logging.warning("No campaign selected")
         await self.select_player(ctx)
-        character_id = self.user_sessions.get("character_id")
-        url = f"{self.api_base_url}/players/{campaign_id}/delete/?character_id={character_id}"
+        session = self.sessions.get(ctx.author.id)
+        character_id = session.character_id if session is not None else None
+        if character_id is None:
+            return
+        path = f"/players/{campaign_id}/delete/"
         try:
-            response = requests.delete(url)
-            if response.status_code == 200:
+            response = await self.api.delete(path, params={"character_id": character_id})
+            if response.ok:
                 logging.info(f"{character_id} deleted")
                 await ctx.send(f"Delete {character_id}")
-                del self.user_sessions["character_id"]
+                self.sessions.update(ctx.author.id, character_name=None, character_id=None)
             else:
                 logging.info(f"Failed to delete {character_id}")
                 await ctx.send(f"Failed to delete {character_id}")
@@ -554,16 +609,16 @@ class AttdmCog(commands.Cog):
         List the current part characters.
         Later this will be updated to reflect only living party characters, with an additional solution for the rest
         """
-        campaign_id = self.user_sessions.get(ctx.author.id)
+        campaign_id = self.sessions.campaign(ctx.author.id)
         if not campaign_id:
             logging.warning("No campaign selected")
         
-        url = f"{self.api_base_url}/players/{campaign_id}/"
+        path = f"/players/{campaign_id}/"
 
         try:
-            response = requests.get(url)
-            if response.status_code == 200:
-                data = response.json()
+            response = await self.api.get(path)
+            if response.ok:
+                data = response.data
                 if data:
                     formatted = "\n".join([f"- {row[0]} (ID: {row[1]}, Class: {row[2]})" for row in data])
                     await ctx.send(f"**Party Member:**\n{formatted}")
@@ -578,7 +633,7 @@ class AttdmCog(commands.Cog):
         """
         List the party's passive stats for either Perception, Investigation, or Insight
         """
-        campaign_id = self.user_sessions.get(ctx.author.id)
+        campaign_id = self.sessions.campaign(ctx.author.id)
         if not campaign_id:
             logging.warning("No campaign selected")
         
@@ -609,19 +664,19 @@ class AttdmCog(commands.Cog):
             logging.warning("No passive stat selected, aborting.")
             return
         
-        url = f"{self.api_base_url}/players/{campaign_id}/passive-stats/?stat_name={selected_passive}"
+        path = f"/players/{campaign_id}/passive-stats/"
 
         try:
-            response = requests.get(url)
-            if response.status_code == 200:
-                stats = response.json()
+            response = await self.api.get(path, params={"stat_name": selected_passive})
+            if response.ok:
+                stats = response.data
                 if stats:
                     formatted_stats = "\n".join([f"- {row[0]}: {row[1]}" for row in stats])
                     await ctx.send(f"**Party {selected_passive.capitalize()} Stats:**\n{formatted_stats}")
                 else:
                     await ctx.send(f"No stats found for {selected_passive}.")
             else:
-                error_detail = response.json().get("detail", "Unknown error")
+                error_detail = response.detail
                 await ctx.send(f"Failed to list stats: {error_detail}")
                 logging.error(f"Failed to list stats: {error_detail}")
         except Exception as e:
@@ -634,22 +689,22 @@ class AttdmCog(commands.Cog):
         Update the character sheet information for the entire party. 
         This is helpful after leveling up to correct any changes.
         """
-        campaign_id = self.user_sessions.get(ctx.author.id)
+        campaign_id = self.sessions.campaign(ctx.author.id)
         if not campaign_id:
             logging.warning(f"Command attempted in incorrect channel: {ctx.channel.id}")
             await ctx.send("This command can only be run in the designated DM channel.")
             return
         
-        url = f"{self.api_base_url}/players/{campaign_id}/update/"
+        path = f"/players/{campaign_id}/update/"
 
         try:
-            response = requests.put(url)
-            if response.status_code == 200:
+            response = await self.api.put(path)
+            if response.ok:
                 await ctx.send("Updating the party's character info.")
                 return
             else:
                 await ctx.send("Error updating the party.")
-                logging.error(f"Error updating party sheets. {response.status_code}: {response.json}")
+                logging.error(f"Error updating party sheets. {response.status}: {response.data}")
         except Exception as e:
             logging.error(f"An error occurred updating character sheets. {e}")
             await ctx.send(f"Error: {e}")
@@ -673,7 +728,7 @@ class AttdmCog(commands.Cog):
             await ctx.send("This command can only be run in the designated DM channel.")
             return
 
-        campaign_id = self.user_sessions.get(ctx.author.id)
+        campaign_id = self.sessions.campaign(ctx.author.id)
         if not campaign_id:
             logging.warning(f"User {ctx.author.id} attempted to roll loot without selecting a campaign.")
             await ctx.send("You have not selected a campaign yet. Use !select_campaign to select one.")
@@ -681,7 +736,7 @@ class AttdmCog(commands.Cog):
 
         await ctx.send("Select a character to roll loot for.")
         await self.select_player(ctx)
-        selected_pc = self.user_sessions.get("character_name")
+        selected_pc = self.sessions.get(ctx.author.id).character_name
         if not selected_pc:
             logging.warning(f"User {ctx.author.id} did not select a player after being prompted.")
             await ctx.send("No player character selected. Aborting loot roll.")
@@ -689,12 +744,12 @@ class AttdmCog(commands.Cog):
 
         # Call the roll loot API
         await ctx.send(f"Rolling loot for {selected_pc}")
-        url = f"{self.api_base_url}/loot/{campaign_id}/roll/?character_name={selected_pc}"
+        path = f"/loot/{campaign_id}/roll/"
         try:
-            logging.info(f"Rolling loot for campaign {campaign_id} and player {selected_pc} via {url}.")
-            response = requests.post(url)
-            if response.status_code == 200:
-                loot, item_urls = response.json()
+            logging.info(f"Rolling loot for campaign {campaign_id} and player {selected_pc} via {path}.")
+            response = await self.api.post(path, params={"character_name": selected_pc})
+            if response.ok:
+                loot, item_urls = response.data
                 if not loot:
                     logging.info(f"No loot rolled for campaign {campaign_id} and player {selected_pc}.")
                     await ctx.send("No loot was rolled.")
@@ -707,7 +762,7 @@ class AttdmCog(commands.Cog):
 
                     # Define the callback for the button
                     async def button_callback(interaction: discord.Interaction, item=item):
-                        self.user_sessions["selected_loot"] = item
+                        self.sessions.update(ctx.author.id, selected_loot=item)
                         logging.info(f"User {ctx.author.id} selected loot item: {item}.")
                         await interaction.response.send_message(f"You selected: {item}", ephemeral=True)
                         nonlocal loot_selected
@@ -723,7 +778,7 @@ class AttdmCog(commands.Cog):
                 await view.wait()
 
                 # Check if loot was selected
-                selected_loot = self.user_sessions.get("selected_loot")
+                selected_loot = self.sessions.get(ctx.author.id).selected_loot
                 if not loot_selected:
                     logging.warning(f"User {ctx.author.id} did not select any loot item.")
                     await ctx.send("No loot item selected.")
@@ -738,13 +793,12 @@ class AttdmCog(commands.Cog):
                     if player_channel:
                         await player_channel.send(f"- {selected_pc} | {selected_loot}")
                         logging.info(f"Loot item '{selected_loot}' sent to player channel for player {selected_pc}.")
-                        del self.user_sessions["selected_loot"]
-                        del self.user_sessions["character_name"]
+                        self.sessions.update(ctx.author.id, selected_loot=None, character_name=None)
                     else:
                         logging.error("Player channel not found.")
                         await ctx.send("Player channel not found.")
             else:
-                error_detail = response.json().get("detail", "Unknown error")
+                error_detail = response.detail
                 logging.error(f"Failed to roll loot: {error_detail}")
                 await ctx.send(f"Failed to roll loot: {error_detail}")
         except Exception as e:
@@ -758,7 +812,7 @@ class AttdmCog(commands.Cog):
         Usage: !add_loot_source
         """
         # Check if the user has already selected a campaign
-        campaign_id = self.user_sessions.get(ctx.author.id)
+        campaign_id = self.sessions.campaign(ctx.author.id)
         if not campaign_id:
             logging.warning(f"User {ctx.author.id} attempted to add loot sources without selecting a campaign.")
             await ctx.send("You have not selected a campaign yet. Use !select_campaign to select one.")
@@ -767,9 +821,9 @@ class AttdmCog(commands.Cog):
         available_sources = ["DMG'24", "PHB'24", "ERLW", "TCE", "XGE"]
 
         class LootSourceButtonView(View):
-            def __init__(self, api_base_url, campaign_id, available_sources):
+            def __init__(self, api, campaign_id, available_sources):
                 super().__init__(timeout=60)
-                self.api_base_url = api_base_url
+                self.api = api
                 self.campaign_id = campaign_id
                 self.selected_sources = []
 
@@ -804,19 +858,20 @@ class AttdmCog(commands.Cog):
                     await interaction.followup.send("No loot sources selected. Please select at least one.", ephemeral=True)
                     return
 
-                url = f"{self.api_base_url}/loot/{self.campaign_id}/sources/"
+                path = f"/loot/{self.campaign_id}/sources/"
                 payload = self.selected_sources
 
                 try:
-                    logging.info(f"Sending POST request to {url} with payload: {payload}")
-                    response = requests.post(url, json=payload)
-                    if response.status_code == 200:
+                    logging.info(f"Sending POST request to {path} with payload: {payload}")
+                    # Adding sources can take a minute on the api side.
+                    response = await self.api.post(path, json=payload, timeout=300)
+                    if response.ok:
                         logging.info(f"Loot sources added successfully to campaign '{self.campaign_id}'.")
                         await interaction.followup.send(
                             f"Loot sources added successfully to campaign '{self.campaign_id}'!", ephemeral=True
                         )
                     else:
-                        error_detail = response.json().get("detail", "Unknown error")
+                        error_detail = response.detail
                         logging.error(f"Failed to add loot sources: {error_detail}")
                         await interaction.followup.send(
                             f"Failed to add loot sources: {error_detail}", ephemeral=True
@@ -829,7 +884,7 @@ class AttdmCog(commands.Cog):
 
                 self.stop()
 
-        view = LootSourceButtonView(self.api_base_url, campaign_id, available_sources)
+        view = LootSourceButtonView(self.api, campaign_id, available_sources)
         await ctx.send("Click on the buttons to select loot sources. Click 'Submit' when done:", view=view)
         await view.wait()
         if not view.is_finished():
@@ -843,19 +898,19 @@ class AttdmCog(commands.Cog):
         Usage: !list_loot_sources
         """
         # Check if the user has already selected a campaign
-        campaign_id = self.user_sessions.get(ctx.author.id)
+        campaign_id = self.sessions.campaign(ctx.author.id)
         if not campaign_id:
             logging.warning(f"User {ctx.author.id} attempted to list loot sources without selecting a campaign.")
             await ctx.send("You have not selected a campaign yet. Use !select_campaign to select one.")
             return
 
-        url = f"{self.api_base_url}/loot/{campaign_id}/sources/"
+        path = f"/loot/{campaign_id}/sources/"
 
         try:
-            logging.info(f"Fetching loot sources for campaign {campaign_id} from {url}.")
-            response = requests.get(url)
-            if response.status_code == 200:
-                loot_sources = response.json()
+            logging.info(f"Fetching loot sources for campaign {campaign_id} from {path}.")
+            response = await self.api.get(path)
+            if response.ok:
+                loot_sources = response.data
                 if loot_sources:
                     formatted_sources = "\n".join(f"- {source}" for source in loot_sources)
                     logging.info(f"Loot sources for campaign {campaign_id}: {formatted_sources}")
@@ -864,7 +919,7 @@ class AttdmCog(commands.Cog):
                     logging.info(f"No loot sources found for campaign {campaign_id}.")
                     await ctx.send(f"No loot sources found for campaign {campaign_id}.")
             else:
-                error_detail = response.json().get("detail", "Unknown error")
+                error_detail = response.detail
                 logging.error(f"Failed to list loot sources for campaign {campaign_id}: {error_detail}")
                 await ctx.send(f"Failed to list loot sources: {error_detail}")
         except Exception as e:
@@ -878,7 +933,7 @@ class AttdmCog(commands.Cog):
         """
         Add a new lore item, either Location or NPC
         """
-        campaign_id = self.user_sessions.get(ctx.author.id)
+        campaign_id = self.sessions.campaign(ctx.author.id)
         if not campaign_id:
             logging.warning("No campaign selected")
             await ctx.send("No campaign selected")
@@ -905,19 +960,19 @@ class AttdmCog(commands.Cog):
             logging.warning("Creation timed out.")
             return
         
-        url = f"{self.api_base_url}/{lore_category}/"
+        path = f"/{lore_category}/"
         payload = {
             "campaign_id": campaign_id,
             "name": lore_item_name,
             "species": lore_item_desc
         }
         try:
-            response = requests.post(url, json=payload)
-            if response.status_code == 200:
+            response = await self.api.post(path, json=payload)
+            if response.ok:
                 logging.info(f"{lore_item_name} created successfully")
                 await ctx.send(f"{lore_item_name} created successfully")
             else:
-                logging.warning(f"Creating item: {lore_item_name} failed. {response.status_code}")
+                logging.warning(f"Creating item: {lore_item_name} failed. {response.status}")
                 await ctx.send(f"Creating item: {lore_item_name} failed")
         except Exception as e:
             logging.error(f"An error has occurred creating {lore_item_name}: {e}")
@@ -928,19 +983,19 @@ class AttdmCog(commands.Cog):
         """
         Edit current campaign lore items
         """
-        campaign_id = self.user_sessions.get(ctx.author.id)
+        campaign_id = self.sessions.campaign(ctx.author.id)
         if not campaign_id:
             logging.warning("No campaign selected")
             await ctx.send("No campaign selected")
             return
         
-        url = f"{self.api_base_url}/{lore_category}/{campaign_id}/"
+        path = f"/{lore_category}/{campaign_id}/"
 
         try:
             logging.info(f"Listing {lore_category} entries")
-            response = requests.get(url)
-            if response.status_code == 200:
-                lore_items = response.json()
+            response = await self.api.get(path)
+            if response.ok:
+                lore_items = response.data
                 formatted_item = "\n".join(f"- {item}" for item in lore_items)
                 await ctx.send(f"**{lore_category} entries for {campaign_id}:**\n{formatted_item}")
             else:
@@ -1,16 +1,47 @@
 import aiohttp
 import asyncio
+import discord
 import ffmpeg
+import glob
 import os
 import logging
 import tempfile
+import time
 import traceback
 import subprocess
 import re
+import uuid
 
 from datetime import datetime
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord.ui import Button, View
+from transcribe.balancer import EndpointPool
+from transcribe.cache import TranscriptionCache
+from transcribe.index import DirectoryListing, SourceIndex, format_duration, format_size
+from transcribe.jobs import (
+    DETECTING,
+    DONE,
+    FAILED,
+    PRIORITY_BACKGROUND,
+    PRIORITY_RESUMED,
+    QUEUED,
+    RUNNING,
+    SPLITTING,
+    UPLOADING,
+    JobQueue,
+    TranscriptionBatch,
+    TranscriptionJob,
+)
+from transcribe.journal import JobJournal
+from transcribe.media import MediaExecutor
+from transcribe.output import TranscriptWriter
+from transcribe.pipe import PipedSegment
+from transcribe.planner import SegmentPlanner, SilenceSkipper, SpanBuilder
+from transcribe.profiles import get_profile
+from transcribe.progress import ProgressMessage
+from transcribe.resilience import RetryPolicy
+from transcribe.silence import PcmSilenceDetector
+from transcribe.upload import SegmentUploader, UploadSlots
 
 
 # Configure logging
@@ -19,6 +50,11 @@ logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s"
     )
 
+SILENCE_START_RE = re.compile(r'silence_start: (-?\d+(\.\d+)?)')
+SILENCE_END_RE = re.compile(r'silence_end: (\d+(\.\d+)?)')
+# `{source name without extension}_{YYYY-MM-DD}.{format}`, as written by `open_transcript`.
+TRANSCRIPT_NAME_RE = re.compile(rf"(.+)_\d{{4}}-\d{{2}}-\d{{2}}\.(?:{'|'.join(TranscriptWriter.FORMATS)})")
+
 class TranscribeCog(commands.Cog):
     """
     Commands for transcribing video and audio files.
@@ -30,151 +66,1108 @@ class TranscribeCog(commands.Cog):
         self.cuda_api_url = os.getenv("CUDA_API_URL")
         self.completed_files = os.getenv("COMPLETED_PATH")
         self.tmp_dir = os.getenv("TMP_DIR")
+        self.upload_concurrency = int(os.getenv("UPLOAD_CONCURRENCY", "4"))
+        self.split_mode = os.getenv("SPLIT_MODE", "single_pass")
+        self.pipeline_mode = os.getenv("PIPELINE_MODE", "batch")
+        self.silence_detector = os.getenv("SILENCE_DETECTOR", "ffmpeg")
+        self.model = os.getenv("WHISPER_MODEL", "faster-whisper-med-en-gpu")
+        self.word_timestamps = os.getenv("TRANSCRIPT_WORD_TIMESTAMPS", "false").lower() == "true"
+        self.transcript_formats = [fmt.strip() for fmt in os.getenv("TRANSCRIPT_FORMATS", "txt,srt,vtt,json").split(",") if fmt.strip()]
+        self.cache = None
+        cache_path = os.getenv("TRANSCRIPTION_CACHE_PATH")
+        if cache_path is None:
+            # TMP_DIR is usually the NFS share, keep SQLite on the container's local disk.
+            cache_path = os.path.join(tempfile.gettempdir(), "transcription_cache.sqlite3")
+        if cache_path:
+            max_entries = int(os.getenv("TRANSCRIPTION_CACHE_MAX_ENTRIES", "50000"))
+            self.cache = TranscriptionCache(cache_path, max_entries=max_entries)
+        self.profile = get_profile(os.getenv("SEGMENT_FORMAT", "copy"))
+        self.segment_storage = os.getenv("SEGMENT_STORAGE", "disk")
+        self.planner = None
+        max_duration = float(os.getenv("SEGMENT_MAX_DURATION", "300"))
+        if max_duration > 0:
+            self.planner = SegmentPlanner(float(os.getenv("SEGMENT_MIN_DURATION", "30")), max_duration)
+        self.skipper = None
+        self.skip_padding = float(os.getenv("SKIP_SILENCE_PADDING", "0.3"))
+        if os.getenv("SKIP_SILENCE", "false").lower() == "true":
+            self.skipper = SilenceSkipper(float(os.getenv("SKIP_SILENCE_MIN", "5")))
+        self.source_index = SourceIndex(self.audio_files)
+        self.completed_listing = DirectoryListing(self.completed_files)
+        self.completed_names = None
+        self.completed_headers = set()
+        self.retry_policy = RetryPolicy(
+            max_attempts=int(os.getenv("UPLOAD_ATTEMPTS", "4")),
+            timeout_base=float(os.getenv("UPLOAD_TIMEOUT_BASE", "60")),
+            timeout_per_second=float(os.getenv("UPLOAD_TIMEOUT_PER_SECOND", "1.0")),
+            timeout_max=float(os.getenv("UPLOAD_TIMEOUT_MAX", "900"))
+        )
+        self.endpoints = EndpointPool.from_config(
+            os.getenv("CUDA_API_URLS") or self.cuda_api_url,
+            failure_threshold=int(os.getenv("BREAKER_FAILURES", "5")),
+            reset_timeout=float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+        )
+        self.progress_interval = float(os.getenv("PROGRESS_INTERVAL", "15"))
+        self.watch_enabled = os.getenv("WATCH_FOLDER", "false").lower() == "true"
+        self.watch_interval = float(os.getenv("WATCH_INTERVAL", "60"))
+        self.watch_settle = float(os.getenv("WATCH_SETTLE_SECONDS", "120"))
+        self.watch_concurrency = int(os.getenv("WATCH_CONCURRENCY", "1"))
+        self.watch_channel_id = int(os.getenv("TRANSCRIBE_CHANNEL", "0"))
+        self.watch_sizes = {}
+        self.auto_ingested = set()
+        self.resumed = False
+        self.submit_lock = asyncio.Lock()
+        self.session = None
+        self.media = MediaExecutor(
+            int(os.getenv("MEDIA_PROCESSES", "0")) or None,
+            int(os.getenv("MEDIA_SCAN_PROCESSES", "0")) or None
+        )
+        self.batch_concurrency = int(os.getenv("BATCH_CONCURRENCY", "4"))
+        self.job_queue = JobQueue(self.run_queued, workers=int(os.getenv("TRANSCRIBE_WORKERS", "1")))
 
-    def detect_audio_silence(self, input_file, silence_threshold='-30dB', silence_duration=1):
+    def iter_silences(self, input_file, silence_threshold='-30dB', silence_duration=1, start=0.0):
         """
-        Use ffmpeg-python to detect silence in the file
-        Returns a list of silence points to split the file for transcription
+        Yield each (silence_start, silence_end) pair as soon as the detector reports it, from `start` seconds on.
+        `SILENCE_DETECTOR` selects ffmpeg's silencedetect filter (`ffmpeg`) or the numpy PCM detector (`numpy`).
         """
+        if self.silence_detector == "numpy":
+            detector = PcmSilenceDetector(silence_threshold, silence_duration, popen=self.media.popen)
+            yield from detector.iter_silences(input_file, start)
+            return
+
+        # ffmpeg stderr is parsed line by line so memory stays flat on long recordings.
+        seek = ['-ss', f"{start:.3f}"] if start else []
         cmd = [
-            'ffmpeg', '-i', input_file,
+            'ffmpeg', '-nostats', *seek, '-i', input_file,
             '-af', f'silencedetect=noise={silence_threshold}:d={silence_duration}',
             '-f', 'null', '-'
         ]
+        process = self.media.popen(cmd, stderr=subprocess.PIPE, stdout=subprocess.DEVNULL, text=True)
+        silence_start = float(start)
         try:
-            result = subprocess.run(cmd, stderr=subprocess.PIPE, text=True)
-            output = result.stderr
-            logging.debug(f"ffmpeg silence detect output: {output}")
-            silence_ends = [float(m.group(1)) for m in re.finditer(r'silence_end: (\d+(\.\d+)?)', output)]
-            logging.info(f"Detected silence ends at: {silence_ends}")
-            return silence_ends
+            for line in process.stderr:
+                match = SILENCE_START_RE.search(line)
+                if match:
+                    silence_start = round(float(match.group(1)) + start, 3)
+                    continue
+                match = SILENCE_END_RE.search(line)
+                if match:
+                    silence_end = round(float(match.group(1)) + start, 3)
+                    logging.debug(f"Silence detected from {silence_start} to {silence_end}")
+                    yield silence_start, silence_end
+            process.wait()
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stderr.close()
+
+    def probe_duration(self, input_file):
+        """
+        Container duration in seconds from ffprobe, or None if it cannot be read.
+        """
+        try:
+            return float(ffmpeg.probe(input_file)["format"]["duration"])
         except Exception as e:
-            logging.error(f"Error detecting silence: {e}")
+            logging.warning(f"Could not probe duration of {input_file}: {e}")
+            return None
+
+    def iter_cut_points(self, input_file, silence_threshold='-30dB', silence_duration=1, start=0.0):
+        """
+        Yield the points to split at. With the segment planner enabled the raw silences are balanced
+        into segments between SEGMENT_MIN_DURATION and SEGMENT_MAX_DURATION, otherwise every silence end is a cut.
+        With SKIP_SILENCE each cut is a [silence_start, silence_end] pair, see `segment_spans`.
+        `start` resumes after a cut already made there, only the audio after it is scanned.
+        """
+        silences = self.iter_silences(input_file, silence_threshold, silence_duration, start)
+        if self.planner is None:
+            def plan(silences):
+                return (silence_end for _, silence_end in silences)
+        else:
+            total_duration = self.probe_duration(input_file)
+
+            def plan(silences):
+                return self.planner.iter_cuts(silences, total_duration, start)
+        if self.skipper is None:
+            yield from plan(silences)
+            return
+        yield from self.skipper.iter_cuts(silences, plan)
+
+    def plan_segments(self, input_file, silence_threshold='-30dB', silence_duration=1):
+        """
+        Returns the list of cut points for the file.
+        """
+        try:
+            cut_points = list(self.iter_cut_points(input_file, silence_threshold, silence_duration))
+            logging.info(f"Planned {len(cut_points) + 1} segments, cutting at: {cut_points}")
+            return cut_points
+        except Exception as e:
+            logging.error(f"Error planning segments: {e}")
             raise
-    
-    def split_audio_silence(self, input_file, silence_ends, ext):
+
+    async def stream_cut_points(self, input_file, silence_threshold='-30dB', silence_duration=1, start=0.0):
+        """
+        Async generator over `iter_cut_points`, the ffmpeg process is read on a media thread
+        and killed if the generator is closed early. It runs on a scan slot, so the segments it yields
+        can be cut and piped on the media slots while the scan goes on.
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+
+        def produce():
+            try:
+                for cut_point in self.iter_cut_points(input_file, silence_threshold, silence_duration, start):
+                    loop.call_soon_threadsafe(queue.put_nowait, cut_point)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+
+        producer = asyncio.ensure_future(self.media.scan(produce))
+        try:
+            while True:
+                cut_point = await queue.get()
+                if cut_point is None:
+                    break
+                yield cut_point
+            await producer
+        finally:
+            if not producer.done():
+                producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
+
+    def pipe_segment(self, input_file, idx, start, duration):
+        """
+        A segment that ffmpeg writes to stdout while it is uploaded, nothing is written to TMP_DIR.
+        """
+        input_kwargs = {'ss': start}
+        if duration:
+            input_kwargs['t'] = duration
+        cmd = (
+            ffmpeg
+            .input(input_file, **input_kwargs)
+            .output('pipe:', format=self.profile.pipe_format, **self.profile.output_kwargs)
+            .global_args('-nostdin', '-loglevel', 'error')
+            .compile()
+        )
+        return PipedSegment(idx, cmd, self.media)
+
+    def new_segment_path(self, ext):
+        """
+        Create an empty temp segment file in TMP_DIR and return its path.
+        """
+        segment_file = tempfile.NamedTemporaryFile(suffix=f".{ext}", delete=False, dir=self.tmp_dir)
+        segment_file.close()
+        return segment_file.name
+
+    async def cut_segment(self, input_file, idx, start, duration, ext, segment_path=None):
+        """
+        Cut a single segment starting at `start` for `duration` seconds (to the end when None)
+        into `segment_path`, a new temp file by default. Returns the path of the segment file.
+        """
+        segment_path = segment_path or self.new_segment_path(ext)
+        input_kwargs = {'ss': start}
+        if duration:
+            input_kwargs['t'] = duration
+        try:
+            logging.info(f"Creating segment {idx}: start={start}, duration={duration}, file={segment_path}")
+            await self.media.exec(
+                ffmpeg
+                .input(input_file, **input_kwargs)
+                .output(segment_path, **self.profile.output_kwargs)
+                .global_args('-nostdin', '-loglevel', 'error')
+                .overwrite_output()
+                .compile()
+            )
+        except BaseException as e:
+            logging.error(f"Error creating segment {idx}: {e!r}")
+            os.unlink(segment_path)
+            raise
+        return segment_path
+
+    async def split_audio_silence(self, input_file, silence_ends, ext):
         """
         Splits the audio file at the silent sections to ease transcription
         """
         segment_files = []
-        prev_end = 0
-        for idx, end in enumerate(silence_ends + [None]):
-            start = prev_end
-            duration = (end - start) if end else None
-            segment_file = tempfile.NamedTemporaryFile(suffix=f".{ext}", delete=False, dir=self.tmp_dir)
-            segment_file.close
-            input_kwargs = {'ss': start}
-            if duration:
-                input_kwargs['t'] = duration
-            try:
-                logging.info(f"Creating segment {idx}: start={start}, duration={duration}, file={segment_file.name}")
-                (
-                    ffmpeg
-                    .input(input_file, **input_kwargs)
-                    .output(segment_file.name, c='copy')
-                    .overwrite_output()
-                    .run(quiet=True)
+        try:
+            for idx, span in enumerate(self.segment_spans(silence_ends)):
+                segment_files.append(await self.cut_segment(input_file, idx, *self.span_timing(span), ext))
+        except BaseException:
+            for segment_path in segment_files:
+                self.remove_segment(segment_path)
+            raise
+        logging.info(f"Creating segments: {segment_files}")
+        return segment_files
+
+    async def split_audio_single_pass(self, input_file, silence_ends, ext):
+        """
+        Splits the audio file at the silent sections in a single ffmpeg pass using the segment muxer.
+        Returns the same ordered list of segment paths as `split_audio_silence`.
+        """
+        if not silence_ends:
+            return await self.split_audio_silence(input_file, silence_ends, ext)
+
+        prefix = os.path.join(self.tmp_dir or tempfile.gettempdir(), f"{uuid.uuid4().hex}_")
+        segment_times = ",".join(f"{end:.3f}" for end in silence_ends)
+        try:
+            logging.info(f"Creating {len(silence_ends) + 1} segments in one pass: prefix={prefix}")
+            await self.media.exec(
+                ffmpeg
+                .input(input_file)
+                .output(
+                    f"{prefix}%05d.{ext}",
+                    f='segment',
+                    segment_times=segment_times,
+                    reset_timestamps=1,
+                    **self.profile.output_kwargs
                 )
-                segment_files.append(segment_file.name)
-            except Exception as e:
-                logging.error(f"Error creating segment {idx}: {e}")
-                raise
-            prev_end = end if end else prev_end
+                .global_args('-nostdin', '-loglevel', 'error')
+                .overwrite_output()
+                .compile()
+            )
+        except BaseException as e:
+            logging.error(f"Error creating segments: {e!r}")
+            for segment_path in glob.glob(f"{glob.escape(prefix)}*.{ext}"):
+                os.unlink(segment_path)
+            raise
+        segment_files = sorted(glob.glob(f"{glob.escape(prefix)}*.{ext}"))
+        if len(segment_files) != len(silence_ends) + 1:
+            # With stream copy the muxer can only cut on keyframes, cut points close together (or within the
+            # last keyframe interval) merge and every later segment would be paired with the wrong span.
+            logging.warning(
+                f"Segment muxer produced {len(segment_files)} segments instead of {len(silence_ends) + 1}, "
+                f"cutting {input_file} per segment instead"
+            )
+            for segment_path in segment_files:
+                self.remove_segment(segment_path)
+            return await self.split_audio_silence(input_file, silence_ends, ext)
         logging.info(f"Creating segments: {segment_files}")
         return segment_files
-    
+
+    async def split_audio(self, input_file, silence_ends, ext):
+        """
+        Split with the engine selected by `SPLIT_MODE` (`single_pass` or `per_segment`).
+        Skipping silence needs gaps between segments, which the segment muxer cannot leave, so it cuts per segment.
+        """
+        if self.split_mode == "per_segment" or self.skipper is not None:
+            return await self.split_audio_silence(input_file, silence_ends, ext)
+        return await self.split_audio_single_pass(input_file, silence_ends, ext)
+
+    def remove_segment(self, segment_path):
+        """
+        Delete a temp segment file, logging instead of raising on failure.
+        """
+        if os.path.exists(segment_path):
+            try:
+                os.unlink(segment_path)
+                logging.info(f"Deleted temp segment file: {segment_path}")
+            except Exception as e:
+                logging.warning(f"Could not delete temp segment file {segment_path}: {e}")
+
+    def segment_spans(self, silence_ends):
+        """
+        (start, end) for every segment cut at `silence_ends`, the last segment has no end.
+        [silence_start, silence_end] cuts leave their silence out, bar SKIP_SILENCE_PADDING either side.
+        """
+        return SpanBuilder.spans(silence_ends, self.skip_padding)[0]
+
+    @staticmethod
+    def span_timing(span):
+        """
+        (start, duration) for a span, duration is None for the last segment.
+        """
+        start, end = span
+        return start, round(end - start, 3) if end is not None else None
+
+    def job_parameters(self, job):
+        """
+        Everything besides the file contents that changes the transcription, used in the cache key.
+        """
+        parameters = [job.silence_threshold, job.silence_duration, self.model]
+        if self.planner is not None:
+            parameters += [self.planner.min_duration, self.planner.max_duration]
+        if self.profile.name != "copy":
+            parameters.append(self.profile.name)
+        if self.word_timestamps:
+            parameters.append("words")
+        if self.skipper is not None:
+            parameters += ["skip", self.skipper.min_silence, self.skip_padding]
+        return parameters
+
+    async def known_result(self, job, job_key, idx, start, end):
+        """
+        Result for a segment already transcribed by an earlier run of this job or found in the cache.
+        """
+        if job.journal is not None and idx in job.journal.results:
+            return job.journal.results[idx]
+        if self.cache is None or job_key is None:
+            return None
+        return await self.cache.call(self.cache.get_segment, job_key, start, end)
+
+    @staticmethod
+    def emit_result(job, idx, start, end, result):
+        """
+        Hand a finished (or failed, `result` None) segment to the job's transcript writer.
+        The last segment runs to the end of the recording.
+        """
+        if job.transcript is not None:
+            job.transcript.add(idx, start, end if end is not None else job.audio_total, result)
+
+    async def transcribe_span(self, job, uploader, job_key, idx, start, end, segment_path, on_error=None):
+        """
+        Upload one segment, record its result in the cache and the job journal and append it to the transcript.
+        """
+        duration = (end - start) if end is not None else None
+        await uploader.transcribe(idx, segment_path, job.file, on_error, duration)
+        job.segment_done(start, end)
+        result = uploader.results.get(idx)
+        self.emit_result(job, idx, start, end, result)
+        if result is None:
+            return
+        job.bytes_uploaded += uploader.segment_size(segment_path)
+        if self.cache is not None and job_key is not None:
+            await self.cache.call(self.cache.put_segment, job_key, start, end, result)
+        if job.journal is not None:
+            await job.journal.add_result(idx, result)
+
+    async def transcribe_streaming(self, job, ext, uploader, job_key=None, on_error=None):
+        """
+        Pipelined detect -> split -> upload.
+        Each segment is cut as soon as its silence end is parsed and uploaded straight away,
+        at most twice the upload concurrency segments exist on disk at once.
+        Cuts and temp segments are journalled as they are made; a resumed job replays the journalled cuts,
+        deletes segments left behind by the crash and only scans the audio after the last cut.
+        Returns the ordered transcription results, failed segments are None.
+        """
+        journal = job.journal
+        in_flight = asyncio.Semaphore(uploader.concurrency * 2)
+        started = time.perf_counter()
+        first_done = False
+        silence_ends = []
+        tasks = []
+        job.set_state(UPLOADING)
+
+        async def cut_and_upload(idx, start, end):
+            nonlocal first_done
+            try:
+                known = await self.known_result(job, job_key, idx, start, end)
+                if known is not None:
+                    uploader.results[idx] = known
+                    job.segment_done(start, end)
+                    self.emit_result(job, idx, start, end, known)
+                    return
+                duration = self.span_timing((start, end))[1]
+                if self.segment_storage == "pipe":
+                    segment = self.pipe_segment(job.input_file, idx, start, duration)
+                    await self.transcribe_span(job, uploader, job_key, idx, start, end, segment, on_error)
+                else:
+                    # Journalled before ffmpeg writes it, so a crash mid-cut still leaves a record to clean up.
+                    segment_path = self.new_segment_path(ext)
+                    try:
+                        if journal is not None:
+                            await journal.add_streamed(segment_path)
+                        encode_started = time.perf_counter()
+                        await self.cut_segment(job.input_file, idx, start, duration, ext, segment_path)
+                        job.encode_seconds += time.perf_counter() - encode_started
+                        await self.transcribe_span(job, uploader, job_key, idx, start, end, segment_path, on_error)
+                    finally:
+                        self.remove_segment(segment_path)
+                if not first_done:
+                    first_done = True
+                    logging.info(f"First segment of {job.file} finished after {time.perf_counter() - started:.2f}s")
+            finally:
+                in_flight.release()
+
+        spans = SpanBuilder(self.skip_padding)
+
+        async def add_cut(cut):
+            silence_ends.append(cut)
+            span = spans.add(cut)
+            job.audio_skipped = spans.skipped
+            if span is None:
+                return
+            await in_flight.acquire()
+            tasks.append(asyncio.create_task(cut_and_upload(len(tasks), *span)))
+
+        resume_at = 0.0
+        if journal is not None:
+            for segment_path in journal.streamed_files:
+                self.remove_segment(segment_path)
+            if journal.cuts:
+                last = journal.cuts[-1]
+                resume_at = last[1] if isinstance(last, (list, tuple)) else last
+                logging.info(f"Resuming silence detection of {job.file} at {resume_at:.1f}s after {len(journal.cuts)} journalled cuts")
+        try:
+            for cut in list(journal.cuts if journal is not None else []):
+                await add_cut(cut)
+            async for cut in self.stream_cut_points(job.input_file, job.silence_threshold, job.silence_duration, resume_at):
+                if journal is not None:
+                    await journal.add_cut(cut)
+                await add_cut(cut)
+            await in_flight.acquire()
+            tasks.append(asyncio.create_task(cut_and_upload(len(tasks), *spans.finish())))
+            job.segments_total = len(tasks)
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        if self.cache is not None and job_key is not None:
+            await self.cache.call(self.cache.put_boundaries, job_key, silence_ends)
+        if journal is not None:
+            await journal.set_boundaries(silence_ends)
+        uploader.log_summary(time.perf_counter() - started)
+        return uploader.ordered_results(len(tasks))
+
+    async def run_transcription(self, job, on_error=None):
+        """
+        Run the full detect -> split -> upload pipeline for one job.
+        Segments already in the job journal or the transcription cache are not cut or uploaded again.
+        Returns the ordered transcription results, failed segments are None.
+        """
+        loop = asyncio.get_running_loop()
+        ext = self.profile.extension(os.path.splitext(job.file)[1][1:])
+        if self.segment_storage == "pipe":
+            ext = self.profile.pipe_extension()
+        job_key = None
+        silence_ends = job.journal.silence_ends if job.journal is not None else None
+        if self.cache is not None:
+            digest = await loop.run_in_executor(None, self.cache.file_digest, job.input_file)
+            job_key = self.cache.job_key(digest, *self.job_parameters(job))
+            if silence_ends is None:
+                silence_ends = await self.cache.call(self.cache.get_boundaries, job_key)
+
+        segment_files = []
+        keep_segments = False
+        uploader = SegmentUploader(
+            await self.get_session(),
+            self.endpoints,
+            concurrency=self.upload_concurrency,
+            model=self.model,
+            suffix=f".{ext}" if self.profile.ext or self.segment_storage == "pipe" else "",
+            retry_policy=self.retry_policy,
+            word_timestamps=self.word_timestamps,
+            slots=job.upload_slots,
+            priority=job.upload_priority
+        )
+        try:
+            if silence_ends is None and self.pipeline_mode == "streaming":
+                return await self.transcribe_streaming(job, ext, uploader, job_key, on_error)
+
+            if silence_ends is None:
+                job.set_state(DETECTING)
+                silence_ends = await self.media.run(
+                    self.plan_segments, job.input_file, job.silence_threshold, job.silence_duration
+                )
+                if self.cache is not None:
+                    await self.cache.call(self.cache.put_boundaries, job_key, silence_ends)
+            if job.journal is not None and job.journal.silence_ends is None:
+                await job.journal.set_boundaries(silence_ends)
+            spans, job.audio_skipped = SpanBuilder.spans(silence_ends, self.skip_padding)
+            job.segments_total = len(spans)
+            for idx, (start, end) in enumerate(spans):
+                known = await self.known_result(job, job_key, idx, start, end)
+                if known is not None:
+                    uploader.results[idx] = known
+                    job.segment_done(start, end)
+                    self.emit_result(job, idx, start, end, known)
+            missing = [idx for idx in range(len(spans)) if idx not in uploader.results]
+            logging.info(f"{job.file}: {job.segments_done} of {len(spans)} segments already transcribed")
+            if not missing:
+                return uploader.ordered_results(len(spans))
+
+            if self.segment_storage == "pipe":
+                job.set_state(UPLOADING)
+                started = time.perf_counter()
+                await asyncio.gather(*(
+                    self.transcribe_span(
+                        job, uploader, job_key, idx, *spans[idx],
+                        self.pipe_segment(job.input_file, idx, *self.span_timing(spans[idx])), on_error
+                    )
+                    for idx in missing
+                ))
+                uploader.log_summary(time.perf_counter() - started)
+                return uploader.ordered_results(len(spans))
+
+            if job.journal is not None:
+                segment_files = job.journal.reusable_segments()
+                if segment_files and len(segment_files) != len(spans):
+                    logging.warning(f"Journalled segments of {job.file} do not match its {len(spans)} spans, splitting again")
+                    for segment_path in segment_files:
+                        self.remove_segment(segment_path)
+                    segment_files = []
+            if not segment_files:
+                job.set_state(SPLITTING)
+                encode_started = time.perf_counter()
+                segment_files = await self.split_audio(job.input_file, silence_ends, ext)
+                job.encode_seconds += time.perf_counter() - encode_started
+                if job.journal is not None:
+                    await job.journal.set_segments(segment_files)
+            if len(segment_files) != len(spans):
+                raise RuntimeError(f"Split {job.file} into {len(segment_files)} segments, expected {len(spans)}")
+            job.set_state(UPLOADING)
+            started = time.perf_counter()
+            await asyncio.gather(*(
+                self.transcribe_span(job, uploader, job_key, idx, *spans[idx], segment_files[idx], on_error)
+                for idx in missing
+            ))
+            uploader.log_summary(time.perf_counter() - started)
+            return uploader.ordered_results(len(spans))
+        except asyncio.CancelledError:
+            # Shutting down mid-job, leave the segments for the journal to resume from.
+            keep_segments = job.journal is not None
+            raise
+        finally:
+            logging.info(
+                f"Job {job.id} ({job.file}): uploaded {job.bytes_uploaded / 1e6:.1f} MB, "
+                f"encode time {job.encode_seconds:.1f}s with the {self.profile.name} segment format, "
+                f"{job.audio_skipped:.0f}s of silence skipped"
+            )
+            if not keep_segments:
+                for segment_path in segment_files:
+                    self.remove_segment(segment_path)
+            if self.cache is not None:
+                logging.info(f"Transcription cache stats: {self.cache.stats()}")
+
+    def open_transcript(self, file):
+        """
+        Start the transcript files for `file` in COMPLETED_PATH, one per TRANSCRIPT_FORMATS entry.
+        They keep a `.partial` suffix until the job commits them.
+        """
+        date_str = datetime.now().strftime("%Y-%m-%d")
+        file_header = os.path.splitext(file)[0]
+        return TranscriptWriter(os.path.join(self.completed_files, f"{file_header}_{date_str}"), self.transcript_formats)
+
+    async def get_session(self):
+        """
+        The aiohttp session shared by every job, created on first use.
+        """
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=600))
+        return self.session
+
+    def find_inflight(self, job):
+        """
+        A queued or running job with the same source file and parameters as `job`, or None.
+        """
+        running, queued = self.job_queue.snapshot()
+        for queued_job in running + queued:
+            for member in queued_job.members():
+                if member.key == job.key and not member.finished.is_set():
+                    return member
+        return None
+
+    async def submit_job(self, job):
+        """
+        Queue a job on the worker pool and return (job, position among waiting jobs, 0 if running).
+        Single-flight: when the same file is already queued or running with the same parameters, the request
+        attaches to that job instead, which then reports to this job's channel too, and the existing job is returned.
+        Submissions hold `submit_lock` while the journal is written, so a duplicate cannot slip in meanwhile.
+        """
+        async with self.submit_lock:
+            existing = self.find_inflight(job)
+            if existing is not None:
+                existing.follow(job.channel)
+                logging.info(f"{job.file} is already in flight as job {existing.id}, attaching instead of queueing job {job.id}")
+                return existing, self.job_queue.position(existing)
+            await self.attach_journal(job)
+            return job, self.job_queue.submit(job)
+
+    async def attach_journal(self, job):
+        """
+        Give a job a journal in TMP_DIR, kept from submission until the job completes or fails.
+        The journal is created on a worker thread, TMP_DIR is usually NFS.
+        """
+        if job.journal is None and self.tmp_dir:
+            job.journal = await asyncio.get_running_loop().run_in_executor(None, lambda: JobJournal.create(
+                self.tmp_dir,
+                input_file=job.input_file,
+                file=job.file,
+                silence_threshold=job.silence_threshold,
+                silence_duration=job.silence_duration,
+                channel_id=getattr(job.channel, "id", None)
+            ))
+
+    def drop_journal(self, journal):
+        """
+        Delete a journal that will not be resumed and the temp segments it left behind. Blocking.
+        """
+        for segment_path in journal.leftover_files():
+            self.remove_segment(segment_path)
+        journal.remove()
+
+    async def submit_batch(self, entries, channel=None):
+        """
+        Queue several source files as one batch and return (batch, position, attached), where `attached` are
+        the files that were already queued or running and were attached to instead of being added to the batch.
+        Durations are probed first so the batch can run its shortest files first.
+        """
+        await self.probe_entries(entries)
+        jobs = []
+        attached = []
+        async with self.submit_lock:
+            for entry in entries:
+                job = TranscriptionJob(entry.path, entry.name, channel)
+                existing = self.find_inflight(job)
+                if existing is not None:
+                    existing.follow(channel)
+                    attached.append(existing)
+                    continue
+                job.audio_total = entry.duration
+                jobs.append(job)
+            if not jobs:
+                return None, 0, attached
+            await asyncio.gather(*(self.attach_journal(job) for job in jobs))
+            batch = TranscriptionBatch(jobs, channel)
+            return batch, self.job_queue.submit(batch), attached
+
+    async def run_queued(self, job):
+        if isinstance(job, TranscriptionBatch):
+            await self.run_batch(job)
+        else:
+            await self.run_job(job)
+
+    async def run_batch(self, batch):
+        """
+        Run a batch as one workload: up to BATCH_CONCURRENCY files at once, shortest first, with every file's
+        segments drawing on one shared pool of UPLOAD_CONCURRENCY upload slots in which shorter files go first.
+        Detection and splitting queue on the media executor in the same order.
+        The batch posts one progress message and one summary, its files post nothing of their own.
+        """
+        batch.set_state(RUNNING)
+        slots = UploadSlots(self.upload_concurrency)
+        admitted = asyncio.Semaphore(max(1, self.batch_concurrency))
+        progress = None
+        if batch.channel is not None:
+            progress = ProgressMessage(batch.channel, batch, self.progress_interval)
+            await progress.start()
+
+        async def run_member(rank, job):
+            async with admitted:
+                job.upload_slots = slots
+                job.upload_priority = rank
+                job.started_at = time.time()
+                await self.run_job(job, batch_progress=progress)
+
+        state = None
+        try:
+            await asyncio.gather(*(run_member(rank, job) for rank, job in enumerate(batch.jobs)))
+            state = DONE if any(job.state == DONE for job in batch.jobs) else FAILED
+        finally:
+            if progress is not None:
+                await progress.finish(state)
+        if batch.channel is not None:
+            await batch.channel.send(self.batch_result(batch))
+        batch.set_state(state)
+
+    def batch_result(self, batch, shown=10):
+        """
+        The summary posted when a batch finishes: the files transcribed and why the others failed.
+        """
+        batch.collect()
+        done = [job for job in batch.jobs if job.state == DONE]
+        failed = [job for job in batch.jobs if job.state != DONE]
+        lines = [
+            f"Batch #{batch.id} finished: {len(done)} of {len(batch.jobs)} files transcribed to {self.completed_files} "
+            f"({batch.bytes_uploaded / 1e6:.1f} MB uploaded, {format_duration(batch.audio_skipped)} of silence skipped)."
+        ]
+        lines += [f"- failed: {job.file} ({job.error})" for job in failed[:shown]]
+        if len(failed) > shown:
+            lines.append(f"...and {len(failed) - shown} more failed.")
+        return "\n".join(lines)
+
+    async def run_job(self, job, batch_progress=None):
+        """
+        Transcribe one file, save the output and report to the job's channel (None when resuming without one).
+        A batch member reports failed segments to `batch_progress` and only messages channels that attached
+        to it from outside the batch.
+        """
+        channels = job.channels()
+        if batch_progress is not None:
+            channels = [channel for channel in channels if channel.id != batch_progress.channel.id]
+
+        async def send(message):
+            for channel in channels:
+                await channel.send(message)
+
+        progress = None
+        if job.channel is not None and batch_progress is None:
+            progress = ProgressMessage(job.channel, job, self.progress_interval)
+
+        async def report_error(idx, message):
+            if progress is not None:
+                progress.add_error(idx, message)
+            elif batch_progress is not None:
+                batch_progress.add_error(idx, f"{job.file}: {message}")
+
+        state = None
+        try:
+            job.audio_total = await self.media.run(self.probe_duration, job.input_file)
+            job.transcript = self.open_transcript(job.file)
+            if progress is not None:
+                await progress.start()
+            try:
+                await self.run_transcription(job, on_error=report_error)
+            except BaseException:
+                job.transcript.discard()
+                raise
+            job.transcript.commit()
+            job.output_file_path = job.transcript.primary_path
+            logging.info(f"Transcription completed! Output saved to {', '.join(job.transcript.paths.values())}")
+            await send(
+                f"Transcription completed! Output saved to {job.output_file_path} "
+                f"({'/'.join(job.transcript.paths)}, {job.bytes_uploaded / 1e6:.1f} MB uploaded, "
+                f"{job.encode_seconds:.0f}s encoding, {format_duration(job.audio_skipped)} of silence skipped)"
+            )
+            state = DONE
+        except Exception as e:
+            logging.error(f"Error during transcription: {e}")
+            logging.error(traceback.format_exc())
+            await send("An error occurred during transcription.")
+            job.error = e
+            state = FAILED
+        finally:
+            if progress is not None:
+                await progress.finish(state)
+        # Cancellation skips this so an interrupted job can be resumed.
+        if job.journal is not None:
+            await asyncio.get_running_loop().run_in_executor(None, job.journal.remove)
+        job.set_state(state)
+
+    async def cog_load(self):
+        self.job_queue.start()
+        if self.watch_enabled and self.audio_files:
+            self.watch_folder.change_interval(seconds=self.watch_interval)
+            self.watch_folder.start()
+
+    async def cog_unload(self):
+        self.watch_folder.cancel()
+        await self.job_queue.stop()
+        self.media.shutdown()
+        if self.cache is not None:
+            self.cache.close()
+        if self.session is not None:
+            await self.session.close()
+
+    def is_stable(self, entry):
+        """
+        True once a file's size and mtime are unchanged since the previous poll and it has not been
+        written to for WATCH_SETTLE_SECONDS, i.e. the recording has finished copying.
+        """
+        previous = self.watch_sizes.get(entry.path)
+        self.source_index.restat(entry)
+        current = (entry.size, entry.mtime)
+        self.watch_sizes[entry.path] = current
+        return previous == current and time.time() - entry.mtime >= self.watch_settle
+
+    @tasks.loop(seconds=60)
+    async def watch_folder(self):
+        """
+        Queue new, fully written recordings from SOURCE_PATH at background priority.
+        Nothing is submitted while interactive jobs are waiting, and at most WATCH_CONCURRENCY
+        watch folder jobs are queued or running at once.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self.refresh_listings)
+            running, queued = self.job_queue.snapshot()
+            if any(job.priority != PRIORITY_BACKGROUND for job in queued):
+                return
+            background = [job for job in running + queued if job.priority == PRIORITY_BACKGROUND]
+            for entry in self.source_index.sorted_entries():
+                if len(background) >= self.watch_concurrency:
+                    return
+                if self.file_status(entry) is not None:
+                    continue
+                key = (entry.path, entry.size, entry.mtime)
+                if key in self.auto_ingested:
+                    continue
+                if not await loop.run_in_executor(None, self.is_stable, entry):
+                    continue
+                self.auto_ingested.add(key)
+                channel = self.bot.get_channel(self.watch_channel_id) if self.watch_channel_id else None
+                job, _ = await self.submit_job(TranscriptionJob(entry.path, entry.name, channel, priority=PRIORITY_BACKGROUND))
+                background.append(job)
+                logging.info(f"Watch folder queued {entry.path} as job {job.id}")
+                if channel is not None:
+                    await channel.send(f"New recording {entry.name} found, queued for transcription (job #{job.id}).")
+        except Exception as e:
+            logging.error(f"Error polling the watch folder: {e}")
+
+    @watch_folder.before_loop
+    async def before_watch_folder(self):
+        await self.bot.wait_until_ready()
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """
+        Resume any job whose journal was left in TMP_DIR by a restart.
+        """
+        if self.resumed or not self.tmp_dir:
+            return
+        self.resumed = True
+        loop = asyncio.get_running_loop()
+        for journal in await loop.run_in_executor(None, JobJournal.find_unfinished, self.tmp_dir):
+            details = journal.job
+            input_file = details.get("input_file")
+            if not input_file or not await loop.run_in_executor(None, os.path.isfile, input_file):
+                logging.warning(f"Dropping journal {journal.path}, source file {input_file} is gone")
+                await loop.run_in_executor(None, self.drop_journal, journal)
+                continue
+            channel = self.bot.get_channel(details["channel_id"]) if details.get("channel_id") else None
+            job = TranscriptionJob(
+                input_file,
+                details["file"],
+                channel,
+                details["silence_threshold"],
+                details["silence_duration"],
+                priority=PRIORITY_RESUMED,
+                journal=journal
+            )
+            logging.info(f"Resuming transcription of {input_file}, {len(journal.results)} segments already done")
+            if (await self.submit_job(job))[0] is not job:
+                # A second journal for a job already resumed, the first one carries on.
+                await loop.run_in_executor(None, self.drop_journal, journal)
+                continue
+            if channel is not None:
+                await channel.send(f"Resuming transcription of {input_file} after a restart...")
+
+    def refresh_listings(self, source=True):
+        """
+        Rescan SOURCE_PATH (unless `source` is False) and COMPLETED_PATH if they changed. Both live on the NAS,
+        so this blocks: run it off the event loop once per page render or watch poll, `file_status` only
+        reads what it found.
+        """
+        if source:
+            self.source_index.refresh()
+        names = self.completed_listing.refresh()
+        if names is not self.completed_names:
+            self.completed_names = names
+            self.completed_headers = {match.group(1) for match in map(TRANSCRIPT_NAME_RE.fullmatch, names) if match}
+
+    def file_status(self, entry):
+        """
+        Job state for a source file if it is queued or running, `done` if a transcript exists for it, else None.
+        """
+        running, queued = self.job_queue.snapshot()
+        for job in running + queued:
+            for member in job.members():
+                if member.input_file == entry.path:
+                    return member.state
+        if os.path.splitext(entry.name)[0] in self.completed_headers:
+            return DONE
+        return None
+
+    def entry_label(self, entry):
+        """
+        Button label with status, duration and size, trimmed to Discord's 80 character limit.
+        """
+        status = self.file_status(entry)
+        details = f" ({format_duration(entry.duration)}, {format_size(entry.size)})"
+        prefix = f"[{status}] " if status else ""
+        name = entry.name[:80 - len(prefix) - len(details)]
+        return f"{prefix}{name}{details}"
+
+    def probe_entry(self, entry):
+        """
+        Probe the duration of a source file once per size/mtime.
+        """
+        self.source_index.restat(entry)
+        if entry.probed != (entry.size, entry.mtime):
+            entry.duration = self.probe_duration(entry.path)
+            entry.probed = (entry.size, entry.mtime)
+        return entry
+
+    async def probe_entries(self, entries):
+        """
+        Probe any entries on a page that have not been probed yet. Returns True if anything changed.
+        ffprobe runs on the media executor, at most MEDIA_PROCESSES at once.
+        """
+        pending = [entry for entry in entries if entry.probed != (entry.size, entry.mtime)]
+        await asyncio.gather(*(self.media.run(self.probe_entry, entry) for entry in pending))
+        return bool(pending)
+
     @commands.command(name="transcribe_audio")
     async def transcribe_audio(self, ctx):
+        """
+        Paginated picker over the files in the transcription source folder.
+        Usage: !transcribe_audio
+        """
         try:
-            files = os.listdir(self.audio_files)
-            if not files:
+            await asyncio.get_running_loop().run_in_executor(None, self.refresh_listings)
+            if not self.source_index.entries:
                 await ctx.send("No audio files found in the specified directory.")
                 return
-            
-            view = View(timeout=300)
-            for file in files:
-                audio_file_path = os.path.join(self.audio_files, file)
-                if os.path.isfile(audio_file_path):
-                    label = file[:80]
-                    custom_id = file[:100]
-                    button = Button(label=label, custom_id=custom_id)
-                    button.callback = self.create_button_callback(ctx, audio_file_path, file)
-                    view.add_item(button)
-                else:
-                    await ctx.send(f"{file} is not a valid file.")
-            await ctx.send(content= "Select the file to transcribe", view=view)
+
+            view = SourcePickerView(self, ctx)
+            message = await ctx.send(content=view.render(), view=view)
+            if await self.probe_entries(view.entries):
+                await message.edit(content=view.render(), view=view)
 
         except Exception as e:
             logging.error(f"Error listing audio files: {e}")
             await ctx.send("An error occurred while listing audio files.")
 
+    async def untranscribed_entries(self):
+        """
+        Source files with no output and no queued or running job.
+        """
+        await asyncio.get_running_loop().run_in_executor(None, self.refresh_listings)
+        return [entry for entry in self.source_index.sorted_entries() if self.file_status(entry) is None]
+
+    @staticmethod
+    def batch_summary(batch, position, attached=(), shown=10):
+        lines = []
+        if batch is not None:
+            names = [f"{job.file} ({format_duration(job.audio_total)})" for job in batch.jobs[:shown]]
+            if len(batch.jobs) > shown:
+                names.append(f"... and {len(batch.jobs) - shown} more")
+            lines.append(f"Queued batch #{batch.id} with {len(batch.jobs)} files (position {position}), shortest first:")
+            lines.extend(f"- {name}" for name in names)
+        if attached:
+            lines.append(
+                "Already in flight, you will get their results too: "
+                + ", ".join(f"{job.file} (job #{job.id})" for job in attached)
+            )
+        return "\n".join(lines)
+
+    @commands.command(name="transcribe_batch")
+    async def transcribe_batch(self, ctx, *names):
+        """
+        Transcribe several files as one batch, shortest first.
+        Usage: !transcribe_batch all | !transcribe_batch <file> [<file> ...]
+        """
+        try:
+            if not names:
+                await ctx.send("Usage: !transcribe_batch all | !transcribe_batch <file> [<file> ...]")
+                return
+            if list(names) == ["all"]:
+                entries = await self.untranscribed_entries()
+            else:
+                await asyncio.get_running_loop().run_in_executor(None, self.source_index.refresh)
+                entries = [self.source_index.get(name) for name in dict.fromkeys(names)]
+                missing = [name for name, entry in zip(dict.fromkeys(names), entries) if entry is None]
+                if missing:
+                    await ctx.send(f"Not found in the source folder: {', '.join(missing)}")
+                    return
+            if not entries:
+                await ctx.send("Every file in the source folder is already transcribed or queued.")
+                return
+            await ctx.send(self.batch_summary(*await self.submit_batch(entries, ctx.channel)))
+        except Exception as e:
+            logging.error(f"Error queueing transcription batch: {e}")
+            await ctx.send("An error occurred while queueing the batch.")
+
+    @commands.command(name="transcribe_status")
+    async def transcribe_status(self, ctx):
+        """
+        Show running and queued transcription jobs. A running batch lists its running and failed files,
+        the rest are only counted, so the message stays under Discord's length limit.
+        Usage: !transcribe_status
+        """
+        running, queued = self.job_queue.snapshot()
+        if not running and not queued:
+            await ctx.send("No transcription jobs are running or queued.")
+            return
+        shown = 10
+        lines = [f"**Transcription jobs** ({len(running)} running, {len(queued)} queued, {self.job_queue.worker_count} workers)"]
+        lines += [f"Backend: {line}" for line in self.endpoints.describe()]
+        lines.append(f"Media: {self.media.describe()}")
+        for job in running:
+            lines.append(f"- {job.describe()}")
+            if isinstance(job, TranscriptionBatch):
+                members = [member for member in job.jobs if member.state not in (QUEUED, DONE)]
+                lines += [f"  - {member.describe()}" for member in members[:shown]]
+                if len(members) > shown:
+                    lines.append(f"  - ... and {len(members) - shown} more")
+        lines += [f"- {job.describe()} (position {position})" for position, job in enumerate(queued[:shown], 1)]
+        if len(queued) > shown:
+            lines.append(f"- ... and {len(queued) - shown} more queued")
+        await ctx.send("\n".join(lines))
+
     def create_button_callback(self, ctx, video_file_path, file, silence_threshold='-30dB', silence_duration=1):
         async def button_callback(interaction):
-            try:
-                await interaction.response.send_message(f"Running silence detection on {video_file_path} and transcribing...")
-
-                ext = os.path.splitext(file)[1][1:]
-                silence_ends = await asyncio.get_event_loop().run_in_executor(
-                    None, self.detect_audio_silence, video_file_path, silence_threshold, silence_duration
-                )
-                segment_files = await asyncio.get_event_loop().run_in_executor(
-                    None, self.split_audio_silence, video_file_path, silence_ends, ext
+            request = TranscriptionJob(video_file_path, file, ctx.channel, silence_threshold, silence_duration)
+            job, position = await self.submit_job(request)
+            if job is not request:
+                where = f"position {position} in the queue" if position else job.state
+                await interaction.response.send_message(
+                    f"{file} is already being transcribed (job #{job.id}, {where}), you will get the same result."
                 )
+                return
+            await interaction.response.send_message(
+                f"Queued {video_file_path} for silence detection and transcription (job #{job.id}, position {position})."
+            )
 
-                results = []
-                timeout = aiohttp.ClientTimeout(total=600)
-                async with aiohttp.ClientSession(timeout=timeout) as session:
-                    for idx, segment_path in enumerate(segment_files):
-                        form = aiohttp.FormData()
-                        with open(segment_path, "rb") as segf:
-                            form.add_field('file', segf, filename=f"{file}.part{idx}")
-                            form.add_field('language', 'en')
-                            form.add_field('model', 'faster-whisper-med-en-gpu')
-                            logging.info(f"Uploading segment {idx}: {segment_path}")
-                            try:
-                                async with session.post(self.cuda_api_url, data=form) as response:
-                                    if response.status == 200:
-                                        transcription_result = await response.json()
-                                        results.append(transcription_result.get("text", ""))
-                                        logging.info(f"Segment {idx} transcribed successfully.")
-                                    else:
-                                        text = await response.text()
-                                        logging.info(f"Segment {idx+1} transcription failed: {text}")
-                                        await ctx.send(f"Segment {idx+1} transcription failed: {text}")
-                            except asyncio.TimeoutError:
-                                logging.error(f"Timeout while uploading segment {idx} to CUDA API")
-                                await ctx.send(f"Timeout while uploading segment {idx} to CUDA API")
-                                continue
-                
-                # Combine and save results
-                combined_text = "\n".join(results)
-                date_str = datetime.now().strftime("%Y-%m-%d")
-                file_header = os.path.splitext(file)[0]
-                output_file_path = os.path.join(self.completed_files, f"{file_header}_{date_str}.txt")
-                try:
-                    with open(output_file_path, "w") as output_file:
-                        output_file.write(combined_text)
-                    logging.info(f"Transcription completed! Output saved to {output_file_path}")
-                    await ctx.send(f"Transcription completed! Output saved to {output_file_path}")
-                except Exception as e:
-                    logging.error(f"Error writing transcription output: {e}")
-                    await ctx.send("Failed to save transcription output.")
+        return button_callback
 
-            except Exception as e:
-                logging.error(f"Error during transcription: {e}")
-                logging.error(traceback.format_exc())
-                await ctx.send("An error occurred during transcription.")
-            finally:
-                if segment_files:
-                    for segment_path in segment_files:
-                        if os.path.exists(segment_path):
-                            try:
-                                os.unlink(segment_path)
-                                logging.info(f"Deleted temp segment file: {segment_path}")
-                            except Exception as e:
-                                logging.warning(f"Could not delete temp segment file {segment_path}: {e}")
+class SourcePickerView(View):
+    """
+    Paginated file picker for `!transcribe_audio`: 20 file buttons per page plus a navigation row
+    with a batch button, staying under Discord's 25 component limit. Durations are probed lazily for the page on screen.
+    """
+    per_page = 20
 
-        return button_callback
+    def __init__(self, cog, ctx):
+        super().__init__(timeout=300)
+        self.cog = cog
+        self.ctx = ctx
+        self.page = 0
+        self.entries = []
+
+    def render(self):
+        """
+        Rebuild the buttons for the current page and return the message content.
+        """
+        self.clear_items()
+        index = self.cog.source_index
+        self.entries, pages = index.page(self.page, self.per_page)
+        self.page = min(self.page, pages - 1)
+        for position, entry in enumerate(self.entries):
+            status = self.cog.file_status(entry)
+            style = discord.ButtonStyle.success if status == DONE else discord.ButtonStyle.secondary
+            button = Button(label=self.cog.entry_label(entry), style=style, row=position // 5)
+            button.callback = self.cog.create_button_callback(self.ctx, entry.path, entry.name)
+            self.add_item(button)
+
+        previous_button = Button(label="Previous", style=discord.ButtonStyle.primary, row=4, disabled=self.page == 0)
+        previous_button.callback = self.previous_callback
+        self.add_item(previous_button)
+        next_button = Button(label="Next", style=discord.ButtonStyle.primary, row=4, disabled=self.page >= pages - 1)
+        next_button.callback = self.next_callback
+        self.add_item(next_button)
+        refresh_button = Button(label="Refresh", style=discord.ButtonStyle.primary, row=4)
+        refresh_button.callback = self.refresh_callback
+        self.add_item(refresh_button)
+        batch_button = Button(label="Transcribe all untranscribed", style=discord.ButtonStyle.success, row=4)
+        batch_button.callback = self.batch_callback
+        self.add_item(batch_button)
+        return f"Select the file to transcribe (page {self.page + 1}/{pages}, {len(index.entries)} files)"
+
+    async def show_page(self, interaction, page):
+        self.page = page
+        await asyncio.get_running_loop().run_in_executor(None, self.cog.refresh_listings, False)
+        await interaction.response.edit_message(content=self.render(), view=self)
+        if await self.cog.probe_entries(self.entries):
+            await interaction.edit_original_response(content=self.render(), view=self)
+
+    async def previous_callback(self, interaction: discord.Interaction):
+        await self.show_page(interaction, self.page - 1)
+
+    async def next_callback(self, interaction: discord.Interaction):
+        await self.show_page(interaction, self.page + 1)
+
+    async def refresh_callback(self, interaction: discord.Interaction):
+        await asyncio.get_running_loop().run_in_executor(None, self.cog.source_index.refresh)
+        await self.show_page(interaction, self.page)
+
+    async def batch_callback(self, interaction: discord.Interaction):
+        entries = await self.cog.untranscribed_entries()
+        if not entries:
+            await interaction.response.send_message("Every file in the source folder is already transcribed or queued.")
+            return
+        # Probing durations for the shortest-first order can take longer than an interaction may go unanswered.
+        await interaction.response.defer()
+        await interaction.followup.send(self.cog.batch_summary(*await self.cog.submit_batch(entries, self.ctx.channel)))
 
 async def setup(bot):
     await bot.add_cog(TranscribeCog(bot))
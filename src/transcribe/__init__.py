@@ -0,0 +1,3 @@
+"""
+Helpers for the transcription cog: segment uploads and related pipeline stages.
+"""
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+
+from transcribe.resilience import CircuitBreaker
+
+
+class Endpoint:
+    """
+    One faster-whisper transcription endpoint with its weight, optional model name, health and throughput.
+    An open circuit breaker ejects the endpoint; once it half-opens the next request re-probes it.
+    """
+    def __init__(self, url, weight=1.0, model=None, failure_threshold=5, reset_timeout=30):
+        self.url = url
+        self.weight = max(float(weight), 0.01)
+        self.model = model
+        self.breaker = CircuitBreaker(url, failure_threshold, reset_timeout)
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.busy_seconds = 0.0
+        self.audio_seconds = 0.0
+        self.bytes_sent = 0
+
+    def load(self):
+        return (self.outstanding + 1) / self.weight
+
+    def release(self, ok, elapsed, audio_seconds=None, size=0):
+        self.outstanding -= 1
+        self.requests += 1
+        self.busy_seconds += elapsed
+        if ok:
+            self.breaker.record_success()
+            self.audio_seconds += audio_seconds or 0.0
+            self.bytes_sent += size
+        else:
+            self.failures += 1
+            self.breaker.record_failure()
+
+    def abandon(self):
+        """
+        Drop a cancelled request, or one that failed on our side, without counting it against the endpoint's health.
+        """
+        self.outstanding -= 1
+        self.breaker.probing = False
+
+    def describe(self):
+        speed = self.audio_seconds / self.busy_seconds if self.busy_seconds else 0.0
+        return (
+            f"{self.breaker.describe()} (weight {self.weight:g}, {self.outstanding} in flight, "
+            f"{self.requests} requests, {self.failures} failed, {speed:.1f} audio-s/s)"
+        )
+
+
+class EndpointPool:
+    """
+    Spreads segment uploads over several endpoints using weighted least-outstanding-requests.
+    """
+    def __init__(self, endpoints):
+        self.endpoints = endpoints
+
+    @classmethod
+    def from_config(cls, value, failure_threshold=5, reset_timeout=30):
+        """
+        Build a pool from a comma separated list of `url`, `url|weight` or `url|weight|model` entries.
+        """
+        endpoints = []
+        for entry in (value or "").split(","):
+            entry = entry.strip()
+            if not entry:
+                continue
+            url, _, rest = entry.partition("|")
+            weight, _, model = rest.partition("|")
+            endpoints.append(Endpoint(url, float(weight or 1), model or None, failure_threshold, reset_timeout))
+        return cls(endpoints)
+
+    async def acquire(self):
+        """
+        Claim the least loaded healthy endpoint, waiting while every endpoint is ejected.
+        """
+        if not self.endpoints:
+            raise RuntimeError("No transcription endpoint configured, set CUDA_API_URL or CUDA_API_URLS")
+        while True:
+            for endpoint in sorted(self.endpoints, key=lambda e: (e.load(), -e.weight)):
+                if endpoint.breaker.allow():
+                    endpoint.outstanding += 1
+                    return endpoint
+            delay = min(endpoint.breaker.retry_in() for endpoint in self.endpoints)
+            logging.warning(f"No healthy transcription endpoint, waiting {delay:.0f}s")
+            await asyncio.sleep(max(delay, 0.5))
+
+    def describe(self):
+        return [endpoint.describe() for endpoint in self.endpoints]
@@ -0,0 +1,156 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TranscriptionCache:
+    """
+    Persistent transcription cache backed by SQLite.
+    Jobs are keyed by a content hash of the source file plus the silence parameters and model name,
+    so renamed or re-uploaded files still hit. Each job stores its segment boundaries and the result
+    (text and timings) of every transcribed segment, letting partial jobs only transcribe what is missing.
+    Segments are evicted least recently used first once `max_entries` is exceeded, checked every
+    `evict_every` inserts. The database must live on a local disk, SQLite locking is unreliable over NFS.
+    `call` runs a method on the cache's own thread so queries stay off the event loop.
+    """
+    def __init__(self, path, max_entries=50000, evict_every=100):
+        self.path = path
+        self.max_entries = max_entries
+        self.evict_every = max(1, evict_every)
+        self.inserts = 0
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache")
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.digests = {}
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        with self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs (key TEXT PRIMARY KEY, silence_ends TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS segments ("
+                "job_key TEXT NOT NULL, start REAL NOT NULL, end REAL NOT NULL, text TEXT NOT NULL, "
+                "last_used REAL NOT NULL, PRIMARY KEY (job_key, start, end))"
+            )
+            self.db.execute("CREATE INDEX IF NOT EXISTS segments_last_used ON segments (last_used)")
+            columns = [row[1] for row in self.db.execute("PRAGMA table_info(segments)")]
+            if "timings" not in columns:
+                self.db.execute("ALTER TABLE segments ADD COLUMN timings TEXT")
+        self.evict()
+
+    async def call(self, func, *args):
+        """
+        Run `func(*args)` (one of this cache's methods) on the cache thread.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.db.close()
+
+    def file_digest(self, path, block_size=1024 * 1024):
+        """
+        sha256 of the file contents, memoised on (path, size, mtime) so unchanged files are hashed once per process.
+        """
+        stat = os.stat(path)
+        memo_key = (path, stat.st_size, stat.st_mtime_ns)
+        if memo_key in self.digests:
+            return self.digests[memo_key]
+        digest = hashlib.sha256()
+        with open(path, "rb") as source:
+            while block := source.read(block_size):
+                digest.update(block)
+        self.digests[memo_key] = digest.hexdigest()
+        return self.digests[memo_key]
+
+    @staticmethod
+    def job_key(digest, *parameters):
+        """
+        Key for a file digest plus the job parameters (silence threshold and duration, model name, ...).
+        """
+        return hashlib.sha256("|".join([digest, *map(str, parameters)]).encode()).hexdigest()
+
+    @staticmethod
+    def span_key(start, end):
+        return round(float(start), 3), (round(float(end), 3) if end is not None else -1.0)
+
+    def get_boundaries(self, job_key):
+        """
+        The cached silence ends for a job, or None if the job has not been seen.
+        """
+        with self.lock:
+            row = self.db.execute("SELECT silence_ends FROM jobs WHERE key = ?", (job_key,)).fetchone()
+            if row is None:
+                return None
+            with self.db:
+                self.db.execute("UPDATE jobs SET last_used = ? WHERE key = ?", (time.time(), job_key))
+        return json.loads(row[0])
+
+    def put_boundaries(self, job_key, silence_ends):
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO jobs (key, silence_ends, last_used) VALUES (?, ?, ?)",
+                (job_key, json.dumps(list(silence_ends)), time.time())
+            )
+
+    def get_segment(self, job_key, start, end):
+        """
+        The cached result for one segment, or None. Counts towards the hit/miss counters.
+        """
+        start, end = self.span_key(start, end)
+        with self.lock:
+            row = self.db.execute(
+                "SELECT text, timings FROM segments WHERE job_key = ? AND start = ? AND end = ?", (job_key, start, end)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            with self.db:
+                self.db.execute(
+                    "UPDATE segments SET last_used = ? WHERE job_key = ? AND start = ? AND end = ?",
+                    (time.time(), job_key, start, end)
+                )
+        text, timings = row
+        return {"text": text, **json.loads(timings)} if timings else {"text": text}
+
+    def put_segment(self, job_key, start, end, result):
+        start, end = self.span_key(start, end)
+        timings = {key: value for key, value in result.items() if key != "text"}
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO segments (job_key, start, end, text, timings, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_key, start, end, result["text"], json.dumps(timings) if timings else None, time.time())
+            )
+        self.inserts += 1
+        if self.inserts % self.evict_every == 0:
+            self.evict()
+
+    def evict(self):
+        """
+        Drop the least recently used segments beyond `max_entries`, then any job left without segments.
+        """
+        with self.lock:
+            count = self.db.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+            excess = count - self.max_entries
+            if excess <= 0:
+                return
+            with self.db:
+                self.db.execute(
+                    "DELETE FROM segments WHERE rowid IN (SELECT rowid FROM segments ORDER BY last_used LIMIT ?)",
+                    (excess,)
+                )
+                self.db.execute("DELETE FROM jobs WHERE key NOT IN (SELECT DISTINCT job_key FROM segments)")
+        logging.info(f"Evicted {excess} cached transcription segments")
+
+    def stats(self):
+        total = self.hits + self.misses
+        hit_rate = self.hits / total if total else 0.0
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": hit_rate}
@@ -0,0 +1,108 @@
+import os
+
+
+class SourceEntry:
+    """
+    A file in SOURCE_PATH. `duration` is probed lazily the first time the file is shown.
+    """
+    def __init__(self, name, path, size, mtime):
+        self.name = name
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.duration = None
+        self.probed = None
+
+
+class DirectoryListing:
+    """
+    Names in a directory, re-read only when the directory mtime changes.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self.mtime = None
+        self.names = set()
+
+    def refresh(self):
+        if not self.directory or not os.path.isdir(self.directory):
+            return self.names
+        mtime = os.stat(self.directory).st_mtime_ns
+        if mtime != self.mtime:
+            with os.scandir(self.directory) as entries:
+                self.names = {entry.name for entry in entries}
+            self.mtime = mtime
+        return self.names
+
+
+class SourceIndex:
+    """
+    Cached index of the transcription source directory.
+    The directory is only rescanned when its mtime changes, and only files not seen before are stat'ed,
+    so listing a folder of hundreds of recordings costs one stat against the NAS.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self.mtime = None
+        self.entries = {}
+
+    def refresh(self):
+        """
+        Rescan if the directory changed. Returns True when the listing was re-read.
+        """
+        mtime = os.stat(self.directory).st_mtime_ns
+        if mtime == self.mtime:
+            return False
+        entries = {}
+        with os.scandir(self.directory) as scan:
+            for dir_entry in scan:
+                if not dir_entry.is_file():
+                    continue
+                entry = self.entries.get(dir_entry.name)
+                if entry is None:
+                    stat = dir_entry.stat()
+                    entry = SourceEntry(dir_entry.name, dir_entry.path, stat.st_size, stat.st_mtime)
+                entries[dir_entry.name] = entry
+        self.entries = entries
+        self.mtime = mtime
+        return True
+
+    def get(self, name):
+        return self.entries.get(name)
+
+    def sorted_entries(self):
+        return sorted(self.entries.values(), key=lambda entry: entry.name.lower())
+
+    def page(self, number, per_page):
+        """
+        Returns (entries on the page, page count); `number` is clamped to the valid range.
+        """
+        ordered = self.sorted_entries()
+        pages = max(1, (len(ordered) + per_page - 1) // per_page)
+        number = min(max(number, 0), pages - 1)
+        return ordered[number * per_page:(number + 1) * per_page], pages
+
+    def restat(self, entry):
+        """
+        Refresh size and mtime for one entry, dropping its cached duration if the file changed.
+        """
+        stat = os.stat(entry.path)
+        if (stat.st_size, stat.st_mtime) != (entry.size, entry.mtime):
+            entry.size = stat.st_size
+            entry.mtime = stat.st_mtime
+            entry.probed = None
+        return entry
+
+
+def format_size(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return "?"
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
@@ -0,0 +1,247 @@
+import asyncio
+import itertools
+import logging
+import os
+import time
+
+QUEUED = "queued"
+DETECTING = "detecting"
+SPLITTING = "splitting"
+UPLOADING = "uploading"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Lower runs first; resumed jobs go ahead of new clicks, watch folder jobs go last.
+PRIORITY_RESUMED = 0
+PRIORITY_INTERACTIVE = 1
+PRIORITY_BACKGROUND = 2
+
+
+class TranscriptionJob:
+    """
+    One file to transcribe, plus the state reported by `!transcribe_status`.
+    """
+    ids = itertools.count(1)
+
+    def __init__(self, input_file, file, channel=None, silence_threshold='-30dB', silence_duration=1, priority=PRIORITY_INTERACTIVE, journal=None):
+        self.id = next(self.ids)
+        self.input_file = input_file
+        self.file = file
+        self.channel = channel
+        self.followers = []
+        self.silence_threshold = silence_threshold
+        self.silence_duration = silence_duration
+        # Jobs with equal keys produce the same transcript, so only one of them needs to run.
+        # Resolved once here, realpath stats every component of the NFS path.
+        self.key = None
+        if input_file is not None:
+            self.key = (os.path.realpath(input_file), str(silence_threshold), float(silence_duration))
+        self.priority = priority
+        self.journal = journal
+        self.state = QUEUED
+        self.segments_done = 0
+        self.segments_total = None
+        self.audio_total = None
+        self.audio_done = 0.0
+        self.audio_skipped = 0.0
+        self.bytes_uploaded = 0
+        self.encode_seconds = 0.0
+        self.output_file_path = None
+        self.transcript = None
+        self.upload_slots = None
+        self.upload_priority = 0
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.finished = asyncio.Event()
+
+    def set_state(self, state):
+        logging.info(f"Job {self.id} ({self.file}): {self.state} -> {state}")
+        self.state = state
+        if state in (DONE, FAILED):
+            self.finished_at = time.time()
+            self.finished.set()
+
+    def follow(self, channel):
+        """
+        Also report this job's result to `channel`, for a duplicate request that attached to it.
+        """
+        if channel is None:
+            return
+        if self.channel is None:
+            self.channel = channel
+        elif channel.id != self.channel.id and all(channel.id != follower.id for follower in self.followers):
+            self.followers.append(channel)
+
+    def channels(self):
+        return ([self.channel] if self.channel is not None else []) + self.followers
+
+    def segment_done(self, start, end):
+        """
+        Count a finished segment and the audio it covers, the last segment (end None) runs to `audio_total`.
+        """
+        self.segments_done += 1
+        if end is None:
+            end = self.audio_total
+        if end is not None:
+            self.audio_done += max(0.0, end - start)
+
+    def audio_rate(self):
+        """
+        Seconds of audio transcribed per second since the job started, i.e. audio-minutes per minute.
+        """
+        if not self.started_at:
+            return 0.0
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        return self.audio_done / elapsed if elapsed > 0 else 0.0
+
+    def eta(self):
+        """
+        Estimated seconds left from the audio rate so far, or None before anything has finished.
+        """
+        rate = self.audio_rate()
+        if self.audio_total is not None and rate > 0:
+            return max(0.0, self.audio_total - self.audio_done - self.audio_skipped) / rate
+        if self.segments_done and self.segments_total and self.started_at:
+            elapsed = time.time() - self.started_at
+            return elapsed / self.segments_done * (self.segments_total - self.segments_done)
+        return None
+
+    def describe(self):
+        """
+        One line summary, e.g. `#3 session.mkv: uploading 12/40 (95s)`.
+        """
+        status = self.state
+        if self.state == UPLOADING:
+            total = self.segments_total if self.segments_total is not None else "?"
+            status = f"{self.state} {self.segments_done}/{total}"
+        if self.started_at:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+            status = f"{status} ({elapsed:.0f}s)"
+        return f"#{self.id} {self.file}: {status}"
+
+    def members(self):
+        return [self]
+
+    def collect(self):
+        """
+        Bring the progress counters up to date. A single job updates them as it runs.
+        """
+
+
+class TranscriptionBatch(TranscriptionJob):
+    """
+    Several files queued as one unit of work. They are ordered shortest first and run together,
+    sharing one pool of upload slots; `!transcribe_status` lists each file under the batch.
+    """
+    def __init__(self, jobs, channel=None, priority=PRIORITY_INTERACTIVE):
+        super().__init__(None, f"batch of {len(jobs)} files", channel, priority=priority)
+        self.jobs = sorted(jobs, key=lambda job: (job.audio_total is None, job.audio_total or 0.0))
+
+    def counts(self):
+        """
+        Number of member files in each state.
+        """
+        counts = {}
+        for job in self.jobs:
+            counts[job.state] = counts.get(job.state, 0) + 1
+        return counts
+
+    def describe(self):
+        """
+        One line summary, e.g. `#7 batch of 5 files: running, 2 done, 1 failed (95s)`.
+        """
+        status = ", ".join([self.state] + [f"{count} {state}" for state, count in self.counts().items()])
+        if self.started_at:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+            status = f"{status} ({elapsed:.0f}s)"
+        return f"#{self.id} {self.file}: {status}"
+
+    def members(self):
+        return self.jobs
+
+    def collect(self):
+        """
+        Sum the members' progress counters into the batch's own, so the batch reports as one job.
+        Totals stay None until every member knows its own, a failed member counts only the segments it finished.
+        """
+        totals = [job.segments_done if job.state == FAILED else job.segments_total for job in self.jobs]
+        self.segments_total = None if None in totals else sum(totals)
+        durations = [job.audio_total for job in self.jobs]
+        self.audio_total = None if None in durations else sum(durations)
+        self.segments_done = sum(job.segments_done for job in self.jobs)
+        self.audio_done = sum(job.audio_done for job in self.jobs)
+        self.audio_skipped = sum(job.audio_skipped for job in self.jobs)
+        self.bytes_uploaded = sum(job.bytes_uploaded for job in self.jobs)
+        self.encode_seconds = sum(job.encode_seconds for job in self.jobs)
+
+
+class JobQueue:
+    """
+    Priority/FIFO queue of transcription jobs drained by a fixed number of workers,
+    so load is admitted at a rate the node can sustain.
+    """
+    def __init__(self, run, workers=1):
+        self.run = run
+        self.worker_count = max(1, int(workers))
+        self.queue = asyncio.PriorityQueue()
+        self.sequence = itertools.count()
+        self.pending = []
+        self.running = []
+        self.workers = []
+
+    def start(self):
+        if not self.workers:
+            self.workers = [asyncio.create_task(self.worker(n)) for n in range(self.worker_count)]
+
+    async def stop(self):
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    def submit(self, job):
+        """
+        Queue a job and return its 1-based position among waiting jobs.
+        """
+        self.pending.append(job)
+        self.queue.put_nowait((job.priority, next(self.sequence), job))
+        waiting = sorted(self.pending, key=lambda queued: queued.priority)
+        return waiting.index(job) + 1
+
+    async def worker(self, number):
+        while True:
+            _, _, job = await self.queue.get()
+            self.pending.remove(job)
+            self.running.append(job)
+            job.started_at = time.time()
+            logging.info(f"Worker {number} picked up job {job.id} ({job.file})")
+            try:
+                await self.run(job)
+                if not job.finished.is_set():
+                    job.set_state(DONE)
+            except Exception as e:
+                logging.error(f"Job {job.id} failed: {e}")
+                job.error = e
+                job.set_state(FAILED)
+            finally:
+                self.running.remove(job)
+                self.queue.task_done()
+
+    def position(self, job):
+        """
+        1-based position of a waiting job (or the batch holding it), 0 once it is running.
+        """
+        for position, queued in enumerate(self.snapshot()[1], 1):
+            if job in queued.members():
+                return position
+        return 0
+
+    def snapshot(self):
+        """
+        (running, queued) jobs, queued in the order they will run.
+        """
+        queued = sorted(self.pending, key=lambda job: (job.priority, job.submitted_at))
+        return list(self.running), queued
@@ -0,0 +1,135 @@
+import asyncio
+import glob
+import json
+import logging
+import os
+import threading
+import uuid
+
+from transcribe.output import transcript_result
+
+
+class JobJournal:
+    """
+    Append-only JSON lines journal for one transcription job, kept in TMP_DIR.
+    It records the job parameters, segment boundaries, segment paths and each segment result
+    so a job interrupted by a restart can resume from the first untranscribed segment.
+    A streaming job records each cut point as it is detected, and each temp segment it cuts, so a restart
+    resumes detection after the last cut and can delete segments it left behind.
+    The file is removed when the job finishes, so any journal left on disk belongs to an unfinished job.
+    Records written while the job runs are appended and fsynced on a worker thread, TMP_DIR is usually NFS.
+    `create`, `remove` and `find_unfinished` block as well, callers on the event loop run them in an executor.
+    """
+    suffix = ".journal"
+
+    def __init__(self, path):
+        self.path = path
+        self.job = {}
+        self.silence_ends = None
+        self.cuts = []
+        self.segment_files = []
+        self.streamed_files = []
+        self.results = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def create(cls, directory, **job):
+        journal = cls(os.path.join(directory, f"{uuid.uuid4().hex}{cls.suffix}"))
+        journal.job = job
+        journal.append("job", **job)
+        return journal
+
+    @classmethod
+    def load(cls, path):
+        """
+        Replay a journal from disk. A torn final line from a crash mid-write is ignored.
+        """
+        journal = cls(path)
+        with open(path) as journal_file:
+            for line in journal_file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logging.warning(f"Skipping unreadable journal line in {path}")
+                    continue
+                journal.apply(record)
+        return journal
+
+    @classmethod
+    def find_unfinished(cls, directory):
+        journals = []
+        for path in sorted(glob.glob(os.path.join(glob.escape(directory), f"*{cls.suffix}"))):
+            try:
+                journals.append(cls.load(path))
+            except Exception as e:
+                logging.error(f"Could not read journal {path}: {e}")
+        return journals
+
+    def apply(self, record):
+        kind = record.pop("type", None)
+        if kind == "job":
+            self.job = record
+        elif kind == "boundaries":
+            self.silence_ends = record["silence_ends"]
+        elif kind == "cut":
+            self.cuts.append(record["cut"])
+        elif kind == "segments":
+            self.segment_files = record["paths"]
+        elif kind == "streamed":
+            self.streamed_files.append(record["path"])
+        elif kind == "result":
+            self.results[record["idx"]] = transcript_result(record.get("result", record.get("text")))
+
+    def append(self, kind, **fields):
+        """
+        Append one record and fsync it so it survives the pod being killed.
+        """
+        line = json.dumps({"type": kind, **fields}) + "\n"
+        with self.lock, open(self.path, "a") as journal_file:
+            journal_file.write(line)
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+
+    async def write(self, kind, **fields):
+        """
+        `append` on a worker thread.
+        """
+        await asyncio.get_running_loop().run_in_executor(None, lambda: self.append(kind, **fields))
+
+    async def set_boundaries(self, silence_ends):
+        self.silence_ends = list(silence_ends)
+        await self.write("boundaries", silence_ends=self.silence_ends)
+
+    async def add_cut(self, cut):
+        self.cuts.append(cut)
+        await self.write("cut", cut=cut)
+
+    async def set_segments(self, segment_files):
+        self.segment_files = list(segment_files)
+        await self.write("segments", paths=self.segment_files)
+
+    async def add_streamed(self, path):
+        self.streamed_files.append(path)
+        await self.write("streamed", path=path)
+
+    async def add_result(self, idx, result):
+        self.results[idx] = result
+        await self.write("result", idx=idx, result=result)
+
+    def leftover_files(self):
+        """
+        Temp segment files this journal knows about: the split segments and any streamed segments.
+        """
+        return self.segment_files + self.streamed_files
+
+    def reusable_segments(self):
+        """
+        The journalled segment files, if every one of them is still on disk.
+        """
+        if self.segment_files and all(os.path.exists(path) for path in self.segment_files):
+            return self.segment_files
+        return []
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
@@ -0,0 +1,205 @@
+import asyncio
+import contextlib
+import contextvars
+import itertools
+import logging
+import math
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Processes started with MediaExecutor.popen inside MediaExecutor.run, killed if that call is cancelled.
+call_processes = contextvars.ContextVar("call_processes", default=None)
+
+
+def cpu_quota():
+    """
+    CPUs this container may use: the cgroup CPU quota rounded up, else the CPUs the process is pinned to.
+    """
+    available = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    quota = None
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as cpu_max:
+            limit, period = cpu_max.read().split()[:2]
+        if limit != "max":
+            quota = int(limit) / int(period)
+    except (OSError, ValueError):
+        try:
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as quota_file, open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as period_file:
+                limit, period = int(quota_file.read()), int(period_file.read())
+            if limit > 0:
+                quota = limit / period
+        except (OSError, ValueError):
+            pass
+    if quota is None:
+        return max(1, available)
+    return max(1, min(available, math.ceil(quota)))
+
+
+class MediaExecutor:
+    """
+    Runs the bot's ffmpeg work with at most `max_processes` ffmpeg children at once (the container's CPU quota
+    by default), on its own threads rather than the default executor shared with the rest of the bot.
+    `exec` runs a command with asyncio's subprocess support, `pipe` starts one whose stdout is read as it
+    runs, and `run` calls a blocking function (silence detection, ffprobe) on a media thread.
+    `scan` is `run` on a separate pool of `max_scans` slots, for a silence scan whose cut points are cut and
+    piped while it is still running: on the shared slots it would hold back the very segments it produces.
+    Cancelling any of them kills its ffmpeg.
+    """
+    def __init__(self, max_processes=None, max_scans=None):
+        self.max_processes = max_processes or cpu_quota()
+        self.max_scans = max_scans or self.max_processes
+        self.slots = asyncio.Semaphore(self.max_processes)
+        self.scan_slots = asyncio.Semaphore(self.max_scans)
+        self.threads = ThreadPoolExecutor(max_workers=self.max_processes + self.max_scans, thread_name_prefix="media")
+        self.call_ids = itertools.count()
+        self.calls = {}
+        self.processes = set()
+        self.queued = 0
+        self.active = 0
+        self.scanning = 0
+        self.completed = 0
+        self.busy_seconds = 0.0
+        self.created_at = time.monotonic()
+
+    @contextlib.asynccontextmanager
+    async def slot(self, scan=False):
+        """
+        Hold one of the `max_processes` slots, or of the `max_scans` slots, counting time spent waiting and running.
+        """
+        slots = self.scan_slots if scan else self.slots
+        self.queued += 1
+        try:
+            await slots.acquire()
+        finally:
+            self.queued -= 1
+        if scan:
+            self.scanning += 1
+        else:
+            self.active += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            if scan:
+                self.scanning -= 1
+            else:
+                self.active -= 1
+            self.completed += 1
+            self.busy_seconds += time.monotonic() - started
+            slots.release()
+
+    async def exec(self, cmd):
+        """
+        Run a command to completion without blocking the event loop.
+        Raises RuntimeError with the end of its stderr if it exits with a non-zero status.
+        """
+        async with self.slot():
+            process = await asyncio.create_subprocess_exec(
+                *cmd, stdin=asyncio.subprocess.DEVNULL, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
+            )
+            self.processes.add(process)
+            try:
+                _, stderr = await process.communicate()
+            finally:
+                self.processes.discard(process)
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+        if process.returncode:
+            message = stderr.decode(errors="replace").strip()[-500:]
+            raise RuntimeError(f"{os.path.basename(cmd[0])} exited with status {process.returncode}: {message}")
+
+    @contextlib.asynccontextmanager
+    async def pipe(self, cmd):
+        """
+        Hold a slot and yield a running process whose stdout is a pipe. The process is killed if it is still
+        running when the block exits; the caller checks its return code.
+        """
+        async with self.slot():
+            process = await asyncio.create_subprocess_exec(
+                *cmd, stdin=asyncio.subprocess.DEVNULL, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+            )
+            self.processes.add(process)
+            try:
+                yield process
+            finally:
+                self.processes.discard(process)
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+
+    async def run(self, func, *args):
+        """
+        Call a blocking `func` on a media thread once a slot is free. Processes it starts through `popen`
+        are killed if the awaiting task is cancelled, and the slot is held until the thread has finished.
+        """
+        return await self.call(False, func, *args)
+
+    async def scan(self, func, *args):
+        """
+        `run` on one of the scan slots.
+        """
+        return await self.call(True, func, *args)
+
+    async def call(self, scan, func, *args):
+        loop = asyncio.get_running_loop()
+        async with self.slot(scan):
+            call_id = next(self.call_ids)
+            processes = self.calls[call_id] = []
+            context = contextvars.copy_context()
+            context.run(call_processes.set, processes)
+            future = loop.run_in_executor(self.threads, context.run, func, *args)
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                self.kill(processes)
+                await asyncio.gather(future, return_exceptions=True)
+                raise
+            finally:
+                del self.calls[call_id]
+
+    def popen(self, cmd, **kwargs):
+        """
+        subprocess.Popen that registers the process with the enclosing `run` call, if any.
+        """
+        process = subprocess.Popen(cmd, **kwargs)
+        processes = call_processes.get()
+        if processes is not None:
+            processes.append(process)
+        return process
+
+    @staticmethod
+    def kill(processes):
+        for process in processes:
+            if process.poll() is None:
+                logging.info(f"Killing ffmpeg process {process.pid}")
+                process.kill()
+
+    def kill_all(self):
+        """
+        Kill every ffmpeg process still running, used when the cog unloads.
+        """
+        for processes in self.calls.values():
+            self.kill(processes)
+        for process in self.processes:
+            if process.returncode is None:
+                process.kill()
+
+    def shutdown(self):
+        self.kill_all()
+        self.threads.shutdown(wait=False, cancel_futures=True)
+
+    def utilization(self):
+        """
+        Share of the slot capacity in use since the executor was created, in-flight calls excluded.
+        """
+        elapsed = time.monotonic() - self.created_at
+        return self.busy_seconds / (elapsed * (self.max_processes + self.max_scans)) if elapsed > 0 else 0.0
+
+    def describe(self):
+        return (
+            f"ffmpeg {self.active}/{self.max_processes} running, {self.scanning}/{self.max_scans} scanning, {self.queued} queued, "
+            f"{self.completed} done, {self.utilization():.0%} utilization"
+        )
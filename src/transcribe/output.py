@@ -0,0 +1,159 @@
+import json
+import os
+
+
+def transcript_result(payload):
+    """
+    The parts of an api response worth keeping: text plus, for verbose_json responses, the segment and
+    word timings relative to the start of the uploaded segment and the segment duration.
+    A plain string (older journals and cache entries) becomes a result without timings.
+    """
+    if isinstance(payload, str):
+        return {"text": payload}
+    result = {"text": payload.get("text", "")}
+    segments = [
+        {"start": float(segment["start"]), "end": float(segment["end"]), "text": segment.get("text", "")}
+        for segment in payload.get("segments") or []
+    ]
+    if segments:
+        result["segments"] = segments
+    words = [
+        {"start": float(word["start"]), "end": float(word["end"]), "word": word.get("word", "")}
+        for word in payload.get("words") or []
+    ]
+    if words:
+        result["words"] = words
+    if payload.get("duration") is not None:
+        result["duration"] = float(payload["duration"])
+    return result
+
+
+def format_timestamp(seconds, separator="."):
+    """
+    `HH:MM:SS.mmm`, SRT wants a comma before the milliseconds.
+    """
+    milliseconds = max(0, round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{milliseconds:03d}"
+
+
+class TranscriptWriter:
+    """
+    Writes a transcript to every requested format in one pass while segments complete.
+    Segments may finish in any order; each is held back until all earlier ones are written, so the files
+    always hold a complete prefix of the recording. Timestamps are absolute: the segment's start in the
+    source plus the offsets the api returned for it. Failed segments leave a gap.
+    The files are written under a `.partial` suffix and only get their final names on `commit`, so a job
+    that fails part way never leaves a transcript that looks finished.
+    """
+    FORMATS = ("txt", "srt", "vtt", "json")
+    PARTIAL_SUFFIX = ".partial"
+
+    def __init__(self, base_path, formats=FORMATS):
+        unknown = set(formats) - set(self.FORMATS)
+        if unknown:
+            raise ValueError(f"Unknown transcript format(s) {', '.join(sorted(unknown))}, expected {', '.join(self.FORMATS)}")
+        self.paths = {fmt: f"{base_path}.{fmt}" for fmt in self.FORMATS if fmt in formats}
+        self.files = {fmt: open(path + self.PARTIAL_SUFFIX, "w", encoding="utf-8") for fmt, path in self.paths.items()}
+        self.pending = {}
+        self.next_idx = 0
+        self.cues = 0
+        self.entries = 0
+        if "vtt" in self.files:
+            self.files["vtt"].write("WEBVTT\n\n")
+        if "json" in self.files:
+            self.files["json"].write("[")
+        self.flush()
+
+    @property
+    def primary_path(self):
+        return self.paths.get("txt") or next(iter(self.paths.values()))
+
+    def add(self, idx, start, end, result):
+        """
+        Record segment `idx` spanning `start`..`end` in the source (end is None for the last segment).
+        `result` is None for a segment that failed.
+        """
+        self.pending[idx] = (start, end, result)
+        while self.next_idx in self.pending:
+            self.write(*self.pending.pop(self.next_idx))
+            self.next_idx += 1
+        self.flush()
+
+    def cues_for(self, start, end, result):
+        text = result["text"].strip()
+        cues = [
+            (start + segment["start"], start + segment["end"], segment["text"].strip())
+            for segment in result.get("segments", [])
+            if segment["text"].strip()
+        ]
+        if not cues and text:
+            cue_end = end if end is not None else start + result.get("duration", 0.0)
+            cues = [(start, cue_end, text)]
+        return cues
+
+    def write(self, start, end, result):
+        if result is None:
+            return
+        text = result["text"].strip()
+        if "txt" in self.files and text:
+            self.files["txt"].write(text + "\n")
+        for cue_start, cue_end, cue_text in self.cues_for(start, end, result):
+            self.cues += 1
+            if "srt" in self.files:
+                self.files["srt"].write(
+                    f"{self.cues}\n{format_timestamp(cue_start, ',')} --> {format_timestamp(cue_end, ',')}\n{cue_text}\n\n"
+                )
+            if "vtt" in self.files:
+                self.files["vtt"].write(f"{format_timestamp(cue_start)} --> {format_timestamp(cue_end)}\n{cue_text}\n\n")
+        if "json" in self.files:
+            entry = {"start": start, "end": end, "text": text}
+            if result.get("segments"):
+                entry["segments"] = [
+                    {**segment, "start": start + segment["start"], "end": start + segment["end"]}
+                    for segment in result["segments"]
+                ]
+            if result.get("words"):
+                entry["words"] = [
+                    {**word, "start": start + word["start"], "end": start + word["end"]}
+                    for word in result["words"]
+                ]
+            self.files["json"].write(("," if self.entries else "") + "\n" + json.dumps(entry))
+            self.entries += 1
+
+    def flush(self):
+        for output_file in self.files.values():
+            output_file.flush()
+
+    def close(self):
+        """
+        Write whatever is still held back (segments after a gap that never filled) and finish the files.
+        """
+        for idx in sorted(self.pending):
+            self.write(*self.pending.pop(idx))
+        if "json" in self.files:
+            self.files["json"].write("\n]\n")
+        for output_file in self.files.values():
+            output_file.close()
+        self.files = {}
+
+    def commit(self):
+        """
+        Finish the files and move them to their final names.
+        """
+        self.close()
+        for path in self.paths.values():
+            os.replace(path + self.PARTIAL_SUFFIX, path)
+
+    def discard(self):
+        """
+        Close and delete the partial files of a job that did not finish.
+        """
+        for output_file in self.files.values():
+            output_file.close()
+        self.files = {}
+        for path in self.paths.values():
+            if os.path.exists(path + self.PARTIAL_SUFFIX):
+                os.unlink(path + self.PARTIAL_SUFFIX)
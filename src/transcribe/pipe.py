@@ -0,0 +1,49 @@
+import contextlib
+import logging
+
+
+class PipeError(RuntimeError):
+    """
+    ffmpeg failed while piping a segment. The fault is local, so it says nothing about the api endpoint.
+    """
+
+
+class PipedSegment:
+    """
+    A segment produced on ffmpeg's stdout when it is uploaded, so its bytes never touch disk.
+    Each call to `open` runs ffmpeg again, which lets a failed upload be sent a second time.
+    ffmpeg runs on `media` (a MediaExecutor), so it counts against the process limit and is killed on unload.
+    """
+    def __init__(self, idx, cmd, media):
+        self.idx = idx
+        self.cmd = cmd
+        self.media = media
+        self.size = 0
+        self.error = None
+
+    def __str__(self):
+        return f"<ffmpeg pipe for segment {self.idx}>"
+
+    @contextlib.asynccontextmanager
+    async def open(self):
+        """
+        Wait for a media slot, start ffmpeg and yield its output as an aiohttp request body.
+        Open it before claiming an endpoint so the wait for a slot is not spent inside the request timeout.
+        """
+        async with self.media.pipe(self.cmd) as process:
+            self.size = 0
+            self.error = None
+            yield self.chunks(process)
+
+    async def chunks(self, process, chunk_size=64 * 1024):
+        """
+        Async generator over ffmpeg's stdout. Raises PipeError if ffmpeg exits with a non-zero status.
+        """
+        while chunk := await process.stdout.read(chunk_size):
+            self.size += len(chunk)
+            yield chunk
+        returncode = await process.wait()
+        if returncode:
+            self.error = PipeError(f"ffmpeg exited with status {returncode} while piping segment {self.idx}")
+            raise self.error
+        logging.debug(f"Piped segment {self.idx}: {self.size} bytes")
@@ -0,0 +1,138 @@
+class SegmentPlanner:
+    """
+    Turns raw silence points into cut points that keep segments within [min_duration, max_duration].
+    Within each window the longest silence wins, so tiny neighbours are merged and over-long spans are
+    split at the best pause available. When a span has no silence at all it is hard cut at max_duration.
+    """
+    def __init__(self, min_duration=30, max_duration=300):
+        self.min_duration = float(min_duration)
+        self.max_duration = float(max_duration)
+
+    def choose(self, pending, prev):
+        """
+        Pick the next cut after `prev` from the pending (silence_start, silence_end) pairs.
+        """
+        limit = prev + self.max_duration
+        window = [s for s in pending if prev + self.min_duration <= s[1] <= limit]
+        if not window:
+            window = [s for s in pending if prev < s[1] <= limit]
+        if not window:
+            return round(limit, 3)
+        return max(window, key=lambda s: (s[1] - s[0], s[1]))[1]
+
+    def iter_cuts(self, silences, total_duration=None, start=0.0):
+        """
+        Yield cut points as soon as they can be decided from an iterable of (silence_start, silence_end) pairs.
+        A cut is final once a silence past the end of its window has been seen; the last cut is held back
+        until the end of the input so a too-short tail can be merged into the previous segment.
+        `start` resumes planning after a cut already made there.
+        """
+        prev = float(start)
+        held = None
+        held_start = prev
+        pending = []
+
+        def take(cut):
+            nonlocal prev, held, held_start, pending
+            previous = held
+            held_start, held, prev = prev, cut, cut
+            pending = [s for s in pending if s[1] > cut]
+            return previous
+
+        for silence in silences:
+            pending.append(silence)
+            while pending and pending[-1][1] > prev + self.max_duration:
+                previous = take(self.choose(pending, prev))
+                if previous is not None:
+                    yield previous
+
+        end = total_duration if total_duration is not None else (pending[-1][1] if pending else prev)
+        pending = [s for s in pending if s[1] < end]
+        while end - prev > self.max_duration:
+            previous = take(self.choose(pending, prev))
+            if previous is not None:
+                yield previous
+
+        if held is None:
+            return
+        if end - prev < self.min_duration and end - held_start <= self.max_duration:
+            return
+        yield held
+
+
+class SilenceSkipper:
+    """
+    Turns cut points into [silence_start, silence_end] pairs so the silence at each cut can be left out of
+    the uploaded audio, and adds a cut at every silence of at least `min_silence` seconds so long pauses
+    inside a planned segment are left out as well.
+    """
+    def __init__(self, min_silence=5.0):
+        self.min_silence = float(min_silence)
+
+    def iter_cuts(self, silences, plan):
+        """
+        `plan` turns an iterable of (silence_start, silence_end) pairs into cut points, e.g. the segment planner.
+        """
+        seen = []
+
+        def watch():
+            for silence in silences:
+                seen.append(silence)
+                yield silence
+
+        starts = {}
+        position = 0
+        last = 0.0
+        for cut in plan(watch()):
+            while position < len(seen) and seen[position][1] <= cut:
+                silence_start, silence_end = seen[position]
+                starts[silence_end] = silence_start
+                position += 1
+                if silence_end < cut and silence_end > last and silence_end - silence_start >= self.min_silence:
+                    yield [silence_start, silence_end]
+                    last = silence_end
+            yield [starts.get(cut, cut), cut]
+            last = cut
+        for silence_start, silence_end in seen[position:]:
+            if silence_end > last and silence_end - silence_start >= self.min_silence:
+                yield [silence_start, silence_end]
+
+
+class SpanBuilder:
+    """
+    Turns cut points into (start, end) segment spans, the last span has no end.
+    A cut is either a point or a [silence_start, silence_end] pair whose silence is left out of both
+    neighbouring segments except for `padding` seconds either side. Spans with no audio beyond that
+    padding are dropped. `skipped` totals the seconds left out.
+    """
+    def __init__(self, padding=0.3):
+        self.padding = float(padding)
+        self.start = 0.0
+        self.skipped = 0.0
+
+    def add(self, cut):
+        """
+        The span ending at `cut`, or None when it was dropped.
+        """
+        start = self.start
+        if not isinstance(cut, (list, tuple)):
+            self.start = cut
+            return start, cut
+        silence_start, silence_end = cut
+        end = round(max(start, min(silence_end, silence_start + self.padding)), 3)
+        self.start = round(max(end, silence_end - self.padding), 3)
+        self.skipped += self.start - end
+        if end - start <= 2 * self.padding:
+            self.skipped += end - start
+            return None
+        return start, end
+
+    def finish(self):
+        return self.start, None
+
+    @classmethod
+    def spans(cls, boundaries, padding=0.3):
+        builder = cls(padding)
+        spans = [span for span in map(builder.add, boundaries) if span is not None]
+        spans.append(builder.finish())
+        return spans, builder.skipped
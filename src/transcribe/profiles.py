@@ -0,0 +1,34 @@
+class TranscodeProfile:
+    """
+    How segments are encoded while splitting.
+    `copy` stream-copies the source container; the others drop video and resample to 16 kHz mono,
+    which is what faster-whisper decodes to anyway.
+    `pipe_format` is the streamable muxer used when segments are piped instead of written to disk.
+    """
+    def __init__(self, name, ext=None, pipe_format=None, **output_kwargs):
+        self.name = name
+        self.ext = ext
+        self.pipe_format = pipe_format
+        self.output_kwargs = output_kwargs
+
+    def extension(self, source_ext):
+        return self.ext or source_ext
+
+    def pipe_extension(self):
+        # Stream copies are piped as matroska since mp4 cannot be written to a pipe.
+        return self.ext or "mkv"
+
+
+PROFILES = {
+    "copy": TranscodeProfile("copy", None, "matroska", c='copy'),
+    "flac": TranscodeProfile("flac", "flac", "flac", vn=None, ac=1, ar=16000, acodec='flac'),
+    "opus": TranscodeProfile("opus", "ogg", "ogg", vn=None, ac=1, ar=16000, acodec='libopus', **{'b:a': '24k'}),
+    "wav": TranscodeProfile("wav", "wav", "wav", vn=None, ac=1, ar=16000, acodec='pcm_s16le'),
+}
+
+
+def get_profile(name):
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown segment format '{name}', expected one of: {', '.join(PROFILES)}")
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+
+from transcribe.index import format_duration, format_size
+from transcribe.jobs import UPLOADING
+
+
+class ProgressMessage:
+    """
+    A single channel message per job that is edited in place with its progress. A batch gets one message
+    for all of its files.
+    Updates are coalesced: the message is edited at most once every `interval` seconds and only when
+    its text changed, so a long job costs a few Discord API calls per minute however many segments it has.
+    Failed segments are listed in the message instead of being posted one by one.
+    """
+    max_errors_shown = 3
+
+    def __init__(self, channel, job, interval=15.0):
+        self.channel = channel
+        self.job = job
+        self.interval = interval
+        self.message = None
+        self.content = None
+        self.task = None
+        self.errors = []
+        self.edits = 0
+
+    def render(self, state=None):
+        """
+        The message text, `state` overrides the job's state for the final update.
+        """
+        job = self.job
+        job.collect()
+        total = job.segments_total if job.segments_total is not None else "?"
+        lines = [f"**{job.file}** (job #{job.id}): {state or job.state}"]
+        if job.members() != [job]:
+            lines.append(", ".join(f"{count} {member_state}" for member_state, count in job.counts().items()))
+        if job.state == UPLOADING or job.segments_done:
+            eta = job.eta()
+            lines.append(
+                f"{job.segments_done}/{total} segments, {job.audio_rate():.1f} audio-min/min, "
+                f"{format_size(job.bytes_uploaded)} uploaded, ETA {format_duration(eta)}"
+            )
+        if job.audio_skipped:
+            lines.append(f"{format_duration(job.audio_skipped)} of silence skipped")
+        if self.errors:
+            lines.append(f"{len(self.errors)} segment(s) failed:")
+            lines += [f"- {message}" for message in self.errors[-self.max_errors_shown:]]
+        return "\n".join(lines)
+
+    async def start(self):
+        self.content = self.render()
+        self.message = await self.channel.send(self.content)
+        self.task = asyncio.create_task(self.refresh())
+
+    async def refresh(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.update()
+
+    async def update(self, state=None):
+        content = self.render(state)
+        if self.message is None or content == self.content:
+            return
+        try:
+            await self.message.edit(content=content)
+        except Exception as e:
+            logging.warning(f"Could not update progress for job {self.job.id}: {e}")
+            return
+        self.content = content
+        self.edits += 1
+
+    def add_error(self, idx, message):
+        self.errors.append(message)
+
+    async def finish(self, state=None):
+        """
+        Stop the periodic refresh and show the final state.
+        """
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        await self.update(state)
+        logging.info(f"Job {self.job.id}: {self.edits} progress message edits")
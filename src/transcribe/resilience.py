@@ -0,0 +1,97 @@
+import logging
+import random
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """
+    Stops requests to an unhealthy backend.
+    After `failure_threshold` consecutive failures the circuit opens and `allow()` refuses requests for
+    `reset_timeout` seconds; then a single probe request is let through and its outcome closes or reopens it.
+    """
+    def __init__(self, name, failure_threshold=5, reset_timeout=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+    def allow(self):
+        """
+        True if a request may be sent right now. Moving from open to half-open lets exactly one probe through.
+        """
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if self.retry_in() > 0:
+                return False
+            self.state = HALF_OPEN
+            self.probing = False
+        if self.probing:
+            return False
+        self.probing = True
+        logging.info(f"Circuit for {self.name} is half-open, sending a probe request")
+        return True
+
+    def retry_in(self):
+        """
+        Seconds until an open circuit lets a probe through.
+        """
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def record_success(self):
+        if self.state != CLOSED:
+            logging.info(f"Circuit for {self.name} closed")
+        self.state = CLOSED
+        self.failures = 0
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logging.warning(f"Circuit for {self.name} opened after {self.failures} failures")
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self.probing = False
+
+    def describe(self):
+        if self.state == OPEN:
+            return f"{self.name}: unavailable, retrying in {self.retry_in():.0f}s"
+        return f"{self.name}: {self.state}"
+
+
+class RetryPolicy:
+    """
+    Per-segment retry settings: jittered exponential backoff between attempts and a request
+    timeout that grows with the segment duration instead of one flat limit for every upload.
+    """
+    def __init__(self, max_attempts=4, backoff_base=1.0, backoff_cap=30.0, timeout_base=60.0, timeout_per_second=1.0, timeout_max=900.0):
+        self.max_attempts = max(1, int(max_attempts))
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout_base = timeout_base
+        self.timeout_per_second = timeout_per_second
+        self.timeout_max = timeout_max
+
+    def delay(self, attempt):
+        """
+        Full jitter backoff before retry number `attempt` (1-based).
+        """
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** (attempt - 1)))
+
+    def timeout(self, duration):
+        """
+        Request timeout for a segment of `duration` seconds, the maximum when the duration is unknown.
+        """
+        if duration is None:
+            return self.timeout_max
+        return min(self.timeout_max, self.timeout_base + self.timeout_per_second * duration)
@@ -0,0 +1,102 @@
+import logging
+import subprocess
+
+import numpy as np
+
+
+def parse_threshold(silence_threshold):
+    """
+    Convert an ffmpeg style noise threshold ('-30dB' or an amplitude ratio like 0.03) to an amplitude ratio.
+    """
+    value = str(silence_threshold).strip()
+    if value.lower().endswith("db"):
+        return 10 ** (float(value[:-2]) / 20)
+    return float(value)
+
+
+class PcmSilenceDetector:
+    """
+    Silence detection on 16 kHz mono PCM decoded by ffmpeg and read from a pipe in fixed-size chunks.
+    Windowed RMS is computed with numpy; a span counts as silence when every window in it is below
+    `silence_threshold` for at least `silence_duration` seconds, matching ffmpeg's silencedetect.
+    `popen` starts the decoder, pass MediaExecutor.popen so a cancelled job can kill it.
+    """
+    def __init__(self, silence_threshold='-30dB', silence_duration=1, sample_rate=16000, window=0.02, chunk_seconds=30, popen=subprocess.Popen):
+        self.threshold = parse_threshold(silence_threshold)
+        self.silence_duration = float(silence_duration)
+        self.sample_rate = sample_rate
+        self.window_samples = max(1, int(sample_rate * window))
+        self.window_seconds = self.window_samples / sample_rate
+        self.chunk_bytes = int(sample_rate * chunk_seconds) // self.window_samples * self.window_samples * 2
+        self.popen = popen
+        self.audio_seconds = 0.0
+
+    def decode_command(self, input_file, start=0.0):
+        seek = ['-ss', f"{start:.3f}"] if start else []
+        return [
+            'ffmpeg', '-nostdin', '-loglevel', 'error', *seek, '-i', input_file,
+            '-vn', '-ac', '1', '-ar', str(self.sample_rate), '-f', 's16le', '-'
+        ]
+
+    def dbfs(self, samples):
+        """
+        Windowed RMS in dBFS for a block of int16 samples whose length is a multiple of the window.
+        """
+        frames = samples.reshape(-1, self.window_samples).astype(np.float32) / 32768.0
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        return 20 * np.log10(np.maximum(rms, 1e-10))
+
+    def scan(self, silent, window_offset, run_start):
+        """
+        Walk the state transitions in a boolean window array.
+        Returns the completed (start, end) silences and the start of a run still open at the chunk end.
+        """
+        silences = []
+        previous = np.concatenate(([run_start is not None], silent[:-1]))
+        for idx in np.flatnonzero(silent != previous):
+            timestamp = float(window_offset + idx) * self.window_seconds
+            if silent[idx]:
+                run_start = timestamp
+            else:
+                if timestamp - run_start >= self.silence_duration:
+                    silences.append((round(run_start, 3), round(timestamp, 3)))
+                run_start = None
+        return silences, run_start
+
+    def iter_silences(self, input_file, start=0.0):
+        """
+        Yield (silence_start, silence_end) pairs as they are found, decoding from `start` seconds on.
+        A silence still running at the end of the file has no end and is not yielded, as with silencedetect.
+        """
+        process = self.popen(self.decode_command(input_file, start), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        window_offset = 0
+        run_start = None
+        leftover = b""
+        try:
+            while True:
+                data = process.stdout.read(self.chunk_bytes)
+                if not data:
+                    break
+                data = leftover + data
+                usable = len(data) // (self.window_samples * 2) * self.window_samples * 2
+                leftover = data[usable:]
+                if not usable:
+                    continue
+                samples = np.frombuffer(data[:usable], dtype=np.int16)
+                silent = self.dbfs(samples) < 20 * np.log10(self.threshold)
+                silences, run_start = self.scan(silent, window_offset, run_start)
+                window_offset += len(silent)
+                for silence in silences:
+                    if start:
+                        silence = (round(silence[0] + start, 3), round(silence[1] + start, 3))
+                    logging.debug(f"Silence detected from {silence[0]} to {silence[1]}")
+                    yield silence
+            process.wait()
+            self.audio_seconds = (window_offset * self.window_samples + len(leftover) // 2) / self.sample_rate
+            if process.returncode:
+                raise RuntimeError(f"ffmpeg exited with status {process.returncode} while decoding {input_file}")
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
@@ -0,0 +1,233 @@
+import asyncio
+import contextlib
+import heapq
+import itertools
+import logging
+import os
+import time
+
+import aiohttp
+
+from transcribe.balancer import EndpointPool
+from transcribe.output import transcript_result
+from transcribe.pipe import PipedSegment
+from transcribe.resilience import RetryPolicy
+
+
+class TranscriptionError(RuntimeError):
+    """
+    Non-200 answer from the transcription api. 429 and 5xx responses are worth retrying.
+    """
+    def __init__(self, status, text):
+        super().__init__(text)
+        self.status = status
+
+    @property
+    def retryable(self):
+        return self.status == 429 or self.status >= 500
+
+
+class UploadSlots:
+    """
+    A pool of upload slots that several uploaders can share. Waiters are served lowest `priority` first,
+    then in arrival order, so a batch can hand freed slots to the segments of its shortest files first.
+    """
+    def __init__(self, size):
+        self.size = max(1, int(size))
+        self.free = self.size
+        self.waiters = []
+        self.sequence = itertools.count()
+
+    async def acquire(self, priority=0):
+        if self.free > 0 and not self.waiters:
+            self.free -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (priority, next(self.sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Handed a slot just as we were cancelled, pass it on.
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        while self.waiters:
+            _, _, future = heapq.heappop(self.waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.free += 1
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority=0):
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class SegmentUploader:
+    """
+    Uploads audio segments to the faster-whisper api with a bounded number of requests in flight.
+    Results are reassembled in segment order no matter which request finishes first.
+    `endpoints` is an EndpointPool or a single api url; every attempt goes to the least loaded healthy endpoint
+    and failed requests are retried per `retry_policy`.
+    Results are requested as verbose_json so segment timings (and word timings with `word_timestamps`) come back.
+    Uploaders of a batch share one UploadSlots pool via `slots`, claiming slots with their `priority`.
+    """
+    def __init__(self, session, endpoints, concurrency=4, language='en', model='faster-whisper-med-en-gpu', suffix="", retry_policy=None, word_timestamps=False, slots=None, priority=0):
+        self.session = session
+        if not isinstance(endpoints, EndpointPool):
+            endpoints = EndpointPool.from_config(endpoints)
+        self.endpoints = endpoints
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.slots = slots or UploadSlots(concurrency)
+        self.concurrency = self.slots.size
+        self.priority = priority
+        self.language = language
+        self.model = model
+        self.suffix = suffix
+        self.word_timestamps = word_timestamps
+        self.bytes_uploaded = 0
+        self.results = {}
+        self.latencies = {}
+
+    @staticmethod
+    @contextlib.asynccontextmanager
+    async def open_segment(segment_path):
+        """
+        The request body for one upload attempt: a file on disk, or for a PipedSegment the output of an
+        ffmpeg that has already got its media slot and started.
+        """
+        if isinstance(segment_path, PipedSegment):
+            async with segment_path.open() as body:
+                yield body
+        else:
+            with open(segment_path, "rb") as body:
+                yield body
+
+    async def upload_segment(self, idx, body, filename, endpoint, timeout=None):
+        """
+        Upload a single segment to `endpoint` and return its result, see `transcript_result`.
+        `body` comes from `open_segment`.
+        Raises TranscriptionError when the api answers with a non-200 status.
+        """
+        form = aiohttp.FormData()
+        form.add_field('file', body, filename=filename)
+        form.add_field('language', self.language)
+        form.add_field('model', endpoint.model or self.model)
+        form.add_field('response_format', 'verbose_json')
+        if self.word_timestamps:
+            form.add_field('timestamp_granularities[]', 'segment')
+            form.add_field('timestamp_granularities[]', 'word')
+        logging.info(f"Uploading segment {idx} to {endpoint.url}: {filename}")
+        request_timeout = aiohttp.ClientTimeout(total=timeout) if timeout else None
+        async with self.session.post(endpoint.url, data=form, timeout=request_timeout) as response:
+            if response.status != 200:
+                text = await response.text()
+                raise TranscriptionError(response.status, text)
+            return transcript_result(await response.json())
+
+    @staticmethod
+    def segment_size(segment_path):
+        if isinstance(segment_path, PipedSegment):
+            return segment_path.size
+        return os.path.getsize(segment_path)
+
+    async def upload_with_retries(self, idx, segment_path, filename, duration=None):
+        """
+        Upload a segment, retrying timeouts, connection errors and retryable api errors with backoff.
+        Each attempt claims an endpoint from the pool, so a retry usually lands on a different backend.
+        The body is opened first, so a piped segment waiting for a media slot holds no endpoint and no request timeout.
+        A PipeError from ffmpeg is not retried and not counted against the endpoint.
+        """
+        policy = self.retry_policy
+        for attempt in range(1, policy.max_attempts + 1):
+            async with self.open_segment(segment_path) as body:
+                endpoint = await self.endpoints.acquire()
+                started = time.perf_counter()
+                try:
+                    result = await self.upload_segment(idx, body, filename, endpoint, policy.timeout(duration))
+                except (asyncio.TimeoutError, aiohttp.ClientError, TranscriptionError) as e:
+                    if isinstance(segment_path, PipedSegment) and segment_path.error is not None:
+                        endpoint.abandon()
+                        raise segment_path.error from e
+                    retryable = not isinstance(e, TranscriptionError) or e.retryable
+                    endpoint.release(not retryable, time.perf_counter() - started)
+                    if not retryable or attempt == policy.max_attempts:
+                        raise
+                    delay = policy.delay(attempt)
+                    logging.warning(f"Segment {idx} attempt {attempt} on {endpoint.url} failed ({type(e).__name__}: {e}), retrying in {delay:.1f}s")
+                except BaseException:
+                    endpoint.abandon()
+                    raise
+                else:
+                    size = self.segment_size(segment_path)
+                    self.bytes_uploaded += size
+                    endpoint.release(True, time.perf_counter() - started, duration, size)
+                    return result
+            await asyncio.sleep(delay)
+
+    async def transcribe(self, idx, segment_path, file, on_error=None, duration=None):
+        """
+        Upload one segment once a slot is free and store its result in `results`.
+        `duration` sizes the request timeout; `on_error` is an optional coroutine called with
+        (idx, message) if the segment still fails after every retry.
+        """
+        async with self.slots.slot(self.priority):
+            started = time.perf_counter()
+            try:
+                self.results[idx] = await self.upload_with_retries(
+                    idx, segment_path, f"{file}.part{idx}{self.suffix}", duration
+                )
+                logging.info(f"Segment {idx} transcribed successfully.")
+            except asyncio.TimeoutError:
+                message = f"Timeout while uploading segment {idx} to CUDA API"
+                logging.error(message)
+                if on_error:
+                    await on_error(idx, message)
+            except Exception as e:
+                message = f"Segment {idx} transcription failed: {e}"
+                logging.error(message)
+                if on_error:
+                    await on_error(idx, message)
+            finally:
+                self.latencies[idx] = time.perf_counter() - started
+                logging.info(f"Segment {idx} upload latency: {self.latencies[idx]:.2f}s")
+
+    def ordered_results(self, count):
+        """
+        Results for segments 0..count-1 in order, failed segments are None.
+        """
+        return [self.results.get(idx) for idx in range(count)]
+
+    async def upload_all(self, segment_files, file, on_error=None):
+        """
+        Upload every segment, keeping at most `concurrency` requests in flight.
+        Returns a list aligned with `segment_files`; failed segments are None.
+        """
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            self.transcribe(idx, path, file, on_error) for idx, path in enumerate(segment_files)
+        ))
+        self.log_summary(time.perf_counter() - started)
+        return self.ordered_results(len(segment_files))
+
+    def log_summary(self, elapsed):
+        """
+        Log the per-job upload latency summary.
+        """
+        if not self.latencies:
+            return
+        ordered = sorted(self.latencies.values())
+        mean = sum(ordered) / len(ordered)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        logging.info(
+            f"Uploaded {len(ordered)} segments in {elapsed:.2f}s with concurrency {self.concurrency}: "
+            f"mean={mean:.2f}s p95={p95:.2f}s max={ordered[-1]:.2f}s"
+        )
+        for line in self.endpoints.describe():
+            logging.info(f"Endpoint {line}")